@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
@@ -7,6 +9,7 @@ from shared.db.session import get_db
 from db.repositories.channel import ChannelRepository
 from db.repositories.video import VideoRepository
 from db.repositories.chat import ChatSessionRepository, ChatMessageRepository
+from services.rag import RAGService
 
 def get_channel_repo(db: Session = Depends(get_db)) -> ChannelRepository:
     return ChannelRepository(db)
@@ -25,3 +28,30 @@ def get_chat_message_repo(db: Session = Depends(get_db)) -> ChatMessageRepositor
 
 def get_settings_repo(db: Session = Depends(get_db)) -> SettingsRepository:
     return SettingsRepository(db)
+
+
+class RequestSettings:
+    """Memoizes settings lookups for the lifetime of a single request."""
+
+    def __init__(self, repo: SettingsRepository):
+        self.repo = repo
+        self._values: dict[tuple[str, Optional[str]], dict] = {}
+
+    def get(self, component: str, section: Optional[str] = None) -> dict:
+        key = (component, section)
+        if key not in self._values:
+            self._values[key] = self.repo.get_settings(component, section)
+        return self._values[key]
+
+
+def get_request_settings(
+    repo: SettingsRepository = Depends(get_settings_repo),
+) -> RequestSettings:
+    return RequestSettings(repo)
+
+
+def get_rag_service(
+    db: Session = Depends(get_db),
+    request_settings: RequestSettings = Depends(get_request_settings),
+) -> RAGService:
+    return RAGService(db, settings=request_settings.get("BACKEND"))
@@ -20,7 +20,7 @@ def list_channels(
     limit: int = 100,
     repo: ChannelRepository = Depends(get_channel_repo),
 ):
-    return repo.get_multi(skip=skip, limit=limit)
+    return repo.get_multi_rows(skip=skip, limit=limit)
 
 
 @router.get("/{channel_id}", response_model=ChannelWithStats)
@@ -32,11 +32,12 @@ def get_channel(
     if not data:
         raise HTTPException(status_code=404, detail="Channel not found")
 
-    return ChannelWithStats(
-        **data["channel"].__dict__,
-        video_count=data["video_count"],
-        downloaded_count=data["downloaded_count"],
-        transcribed_count=data["transcribed_count"],
+    return ChannelWithStats.model_validate(data["channel"]).model_copy(
+        update={
+            "video_count": data["video_count"],
+            "downloaded_count": data["downloaded_count"],
+            "transcribed_count": data["transcribed_count"],
+        }
     )
 
 
@@ -45,8 +46,7 @@ def create_channel(
     channel_in: ChannelCreate,
     repo: ChannelRepository = Depends(get_channel_repo),
 ):
-    existing = repo.get_by_url(channel_in.url)
-    if existing:
+    if repo.exists_by_url(channel_in.url):
         raise HTTPException(status_code=400, detail="Channel already exists")
 
     name = channel_in.url.split("@")[-1]
@@ -3,8 +3,10 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from api.deps import get_rag_service
 from db.repositories.chat import ChatSessionRepository
 
 from shared.db.session import get_db
@@ -18,6 +20,7 @@ from schemas.chat import (
     AskRequest,
     AskResponse,
 )
+from schemas.video import VideoResponse
 
 
 router = APIRouter()
@@ -30,18 +33,7 @@ def list_sessions(
     db: Session = Depends(get_db),
 ):
     repo = ChatSessionRepository(db)
-    sessions = repo.get_multi(skip=skip, limit=limit)
-
-    result = []
-    for session in sessions:
-        # messages = repo.get_messages(session.id, limit=1)
-        result.append(
-            ChatSessionResponse(
-                **session.__dict__,
-                message_count=len(repo.get_messages(session.id, limit=1000)),
-            )
-        )
-    return result
+    return repo.get_multi_rows(skip=skip, limit=limit)
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionDetail)
@@ -57,11 +49,15 @@ def get_session(
 
     messages = repo.get_messages(session_id)
 
+    # Not model_validate(session): that would lazy-load every message
     return ChatSessionDetail(
-        **session.__dict__,
-        # videos=repo.get_video_by_ids(session.id),
-        messages=[ChatMessageResponse(**m.__dict__) for m in messages],
-        message_count=len(messages),
+        id=session.id,
+        title=session.title,
+        channel_id=session.channel_id,
+        created_at=session.created_at,
+        message_count=session.message_count,
+        videos=[VideoResponse.model_validate(v) for v in session.videos],
+        messages=[ChatMessageResponse(**m) for m in messages],
     )
 
 
@@ -80,24 +76,25 @@ def delete_session(
 def ask_stream(
     request: AskRequest,
     db: Session = Depends(get_db),
+    rag_service: RAGService = Depends(get_rag_service),
 ):
-    rag_service = RAGService(db)
-
-    task = PipelineTask(
-        task_type="embed_question",
-        status=TaskStatus.PENDING,
-        request={"question_to_embed": request.question},
+    task_id = db.scalar(
+        insert(PipelineTask)
+        .values(
+            task_type="embed_question",
+            status=TaskStatus.PENDING,
+            request={"question_to_embed": request.question},
+        )
+        .returning(PipelineTask.id)
     )
-    db.add(task)
     db.commit()
-    db.refresh(task)
 
     return StreamingResponse(
         rag_service.ask_stream(
             question=request.question,
             channel_id=request.channel_id,
             video_ids=request.video_ids,
-            task_id=task.id,
+            task_id=task_id,
             session_id=request.session_id,
         ),
         media_type="application/x-ndjson"
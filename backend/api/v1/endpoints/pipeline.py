@@ -1,18 +1,22 @@
 import asyncio
-import json
+import base64
+import time
 
-from datetime import datetime, timezone
+from datetime import datetime
 
 from typing import Optional
 from uuid import UUID
 
+import orjson
+
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
 from sqlalchemy.orm import Session
-from sqlalchemy import delete
+from sqlalchemy import delete, func, insert, select, tuple_
 
-from shared.db.session import get_db
+from services.task_events import task_event_broadcaster
+from shared.db.session import get_db, get_db_context
 from shared.db.models import Channel, Video, Chunk, PipelineTask, TaskStatus
 from schemas.pipeline import (
     PaginatedTasksResponse,
@@ -23,6 +27,50 @@ from schemas.pipeline import (
 
 router = APIRouter()
 
+STATS_CACHE_TTL = 5  # seconds
+HEARTBEAT_INTERVAL = 30  # seconds
+TASK_STREAM_BATCH_SIZE = 50
+
+# (expires_at, stats) shared by every request served by this process
+_stats_cache: tuple[float, Optional[PipelineStatsResponse]] = (0.0, None)
+
+# Columns backing PipelineTaskResponse; skips the `request` JSON payload
+TASK_LIST_COLUMNS = (
+    PipelineTask.id,
+    PipelineTask.task_type,
+    PipelineTask.status,
+    PipelineTask.progress,
+    PipelineTask.error_message,
+    PipelineTask.result,
+    PipelineTask.created_at,
+    PipelineTask.started_at,
+    PipelineTask.completed_at,
+)
+
+# Built once so every call hits the engine's compiled-statement cache
+_video_stats = (
+    select(
+        func.count().label("videos"),
+        func.count().filter(Video.downloaded.is_(True)).label("downloaded"),
+        func.count().filter(Video.transcribed.is_(True)).label("transcribed"),
+    )
+    .select_from(Video)
+    .subquery()
+)
+_chunk_stats = (
+    select(
+        func.count().label("chunks"),
+        func.count(Chunk.embedding).label("embedded"),
+    )
+    .select_from(Chunk)
+    .subquery()
+)
+PIPELINE_STATS_STMT = select(
+    select(func.count()).select_from(Channel).scalar_subquery().label("channels"),
+    _video_stats,
+    _chunk_stats,
+)
+
 
 # -------------------------------------------------------------------------
 # Stats
@@ -30,27 +78,57 @@ router = APIRouter()
 @router.get("/stats", response_model=PipelineStatsResponse)
 def get_pipeline_stats(db: Session = Depends(get_db)):
     """Get pipeline statistics."""
-    return PipelineStatsResponse(
-        total_channels=db.query(Channel).count(),
-        total_videos=db.query(Video).count(),
-        videos_downloaded=db.query(Video).filter(Video.downloaded.is_(True)).count(),
-        videos_transcribed=db.query(Video).filter(Video.transcribed.is_(True)).count(),
-        total_chunks=db.query(Chunk).count(),
-        chunks_embedded=db.query(Chunk).filter(Chunk.embedding.isnot(None)).count(),
+    global _stats_cache
+
+    expires_at, cached = _stats_cache
+    if cached is not None and time.monotonic() < expires_at:
+        return cached
+
+    row = db.execute(PIPELINE_STATS_STMT).one()
+
+    stats = PipelineStatsResponse(
+        total_channels=row.channels,
+        total_videos=row.videos,
+        videos_downloaded=row.downloaded,
+        videos_transcribed=row.transcribed,
+        total_chunks=row.chunks,
+        chunks_embedded=row.embedded,
     )
+    _stats_cache = (time.monotonic() + STATS_CACHE_TTL, stats)
+    return stats
 
 
 # -------------------------------------------------------------------------
 # Task Management
 # -------------------------------------------------------------------------
+def _encode_cursor(created_at: datetime, task_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, task_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(task_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/tasks", response_model=PaginatedTasksResponse)
 def list_tasks(
     status: Optional[TaskStatus] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """List pipeline tasks with pagination."""
+    """
+    List pipeline tasks with pagination.
+
+    Pass the previous response's `next_cursor` as `cursor` to page by keyset
+    instead of OFFSET; `page` is then ignored.
+    """
     if page < 1:
         page = 1
     if page_size < 1:
@@ -58,24 +136,81 @@ def list_tasks(
     if page_size > 100:
         page_size = 100
     
-    query = db.query(PipelineTask).order_by(PipelineTask.created_at.desc())
-    
-    if status:
-        query = query.filter(PipelineTask.status == status)
-    
-    total = query.count()
+    filters = [PipelineTask.status == status] if status else []
+
+    total = db.scalar(
+        select(func.count()).select_from(PipelineTask).where(*filters)
+    ) or 0
     total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-    offset = (page - 1) * page_size
-    tasks = query.offset(offset).limit(page_size).all()
+
+    stmt = (
+        select(*TASK_LIST_COLUMNS)
+        .where(*filters)
+        .order_by(PipelineTask.created_at.desc(), PipelineTask.id.desc())
+        .limit(page_size)
+    )
+
+    if cursor:
+        stmt = stmt.where(
+            tuple_(PipelineTask.created_at, PipelineTask.id) < _decode_cursor(cursor)
+        )
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    tasks = db.execute(stmt).mappings().all()
+
+    next_cursor = None
+    if len(tasks) == page_size:
+        next_cursor = _encode_cursor(tasks[-1]["created_at"], tasks[-1]["id"])
     
     return PaginatedTasksResponse(
-        items=[PipelineTaskResponse.model_validate(t) for t in tasks],
+        items=[PipelineTaskResponse(**t) for t in tasks],
         total=total,
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        next_cursor=next_cursor,
+    )
+
+@router.get("/tasks/stream")
+def stream_tasks(
+    status: Optional[TaskStatus] = None,
+    page: int = 1,
+    page_size: int = 20,
+):
+    """
+    Same page as `GET /tasks`, streamed as NDJSON (one task per line).
+
+    Rows are fetched through a server-side cursor in batches, so memory stays
+    bounded however large the `result` payloads are.
+    """
+    if page < 1:
+        page = 1
+    if page_size < 1:
+        page_size = 20
+    if page_size > 100:
+        page_size = 100
+
+    filters = [PipelineTask.status == status] if status else []
+
+    stmt = (
+        select(*TASK_LIST_COLUMNS)
+        .where(*filters)
+        .order_by(PipelineTask.created_at.desc(), PipelineTask.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .execution_options(stream_results=True, yield_per=TASK_STREAM_BATCH_SIZE)
     )
 
+    def row_generator():
+        # Own session: the cursor must outlive the request dependency scope
+        with get_db_context() as db:
+            for row in db.execute(stmt).mappings():
+                yield PipelineTaskResponse(**row).model_dump_json() + "\n"
+
+    return StreamingResponse(row_generator(), media_type="application/x-ndjson")
+
+
 @router.get("/tasks/{task_id}", response_model=PipelineTaskResponse)
 def get_task(task_id: UUID, db: Session = Depends(get_db)):
     """Get task by ID."""
@@ -97,14 +232,16 @@ def create_task(task_request: TaskRequest, db: Session = Depends(get_db)):
         raise ValueError(f"Task type {task_request.task_type} must defined question_to_embed")
 
 
-    task = PipelineTask(
-        task_type=task_request.task_type,
-        status=TaskStatus.PENDING,
-        request=task_request.model_dump(),
-    )
-    db.add(task)
+    task = db.execute(
+        insert(PipelineTask)
+        .values(
+            task_type=task_request.task_type,
+            status=TaskStatus.PENDING,
+            request=task_request.model_dump(),
+        )
+        .returning(PipelineTask.id, PipelineTask.status)
+    ).one()
     db.commit()
-    db.refresh(task)
 
     return {
         "task_id": str(task.id),
@@ -113,88 +250,48 @@ def create_task(task_request: TaskRequest, db: Session = Depends(get_db)):
 
 @router.delete("/tasks/{task_id}", status_code=204)
 def delete_task(task_id: UUID, db: Session = Depends(get_db)):
-    task = db.get(PipelineTask, task_id)
+    deleted_id = db.scalar(
+        delete(PipelineTask)
+        .where(PipelineTask.id == task_id)
+        .returning(PipelineTask.id)
+    )
+    db.commit()
 
-    if task is None:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
-
 
 # -------------------------------------------------------------------------
 # SSE Notifications
 # -------------------------------------------------------------------------
 @router.get("/events")
-async def task_events(db: Session = Depends(get_db)):
+async def task_events():
     """
     Server-Sent Events endpoint for real-time task notifications.
     Streams task status changes (completed/failed) to connected clients.
     """
-    
+
     async def event_generator():
-        # Track task states we've seen
-        seen_task_states: dict[str, str] = {}
-        
-        # Initial load - mark all current completed/failed tasks as seen
-        initial_tasks = db.query(PipelineTask).filter(
-            PipelineTask.status.in_([TaskStatus.COMPLETED, TaskStatus.FAILED])
-        ).all()
-        
-        for task in initial_tasks:
-            seen_task_states[str(task.id)] = task.status.value
-        
-        # Send initial connection event
-        yield f"event: connected\ndata: {json.dumps({'message': 'Connected to notifications'})}\n\n"
-        
-        while True:
-            try:
-                # Refresh the session to get latest data
-                db.expire_all()
-                
-                # Query for completed and failed tasks
-                tasks = db.query(PipelineTask).filter(
-                    PipelineTask.status.in_([TaskStatus.COMPLETED, TaskStatus.FAILED])
-                ).order_by(PipelineTask.completed_at.desc()).limit(20).all()
-                
-                for task in tasks:
-                    task_id = str(task.id)
-                    current_status = task.status.value
-                    
-                    # Check if this is a new status we haven't seen
-                    if task_id not in seen_task_states or seen_task_states[task_id] != current_status:
-                        seen_task_states[task_id] = current_status
-                        
-                        # Only send notification if task was recently completed (within last 60 seconds)
-                        # This prevents flooding when first connecting
-                        if task.completed_at:
-                            time_diff = (datetime.now(timezone.utc) - task.completed_at).total_seconds()
-                            if time_diff < 60:
-                                event_data = {
-                                    "type": "task_update",
-                                    "task": {
-                                        "id": task_id,
-                                        "task_type": task.task_type,
-                                        "status": current_status,
-                                        "progress": task.progress,
-                                        "error_message": task.error_message,
-                                        "result": task.result,
-                                        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-                                    }
-                                }
-                                yield f"event: task_update\ndata: {json.dumps(event_data)}\n\n"
-                
-                # Send heartbeat every 30 seconds to keep connection alive
-                yield f"event: heartbeat\ndata: {json.dumps({'timestamp': datetime.utcnow().isoformat()})}\n\n"
-                
-                # Wait before next check
-                await asyncio.sleep(5)
-                
-            except Exception as e:
-                # Send error event
-                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
-                await asyncio.sleep(5)
-    
+        queue = task_event_broadcaster.subscribe()
+
+        try:
+            # Send initial connection event
+            yield f"event: connected\ndata: {orjson.dumps({'message': 'Connected to notifications'}).decode()}\n\n"
+
+            while True:
+                try:
+                    # Block until Postgres NOTIFYs a task completion
+                    task = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Send heartbeat to keep connection alive
+                    yield f"event: heartbeat\ndata: {orjson.dumps({'timestamp': datetime.utcnow().isoformat()}).decode()}\n\n"
+                    continue
+
+                event_data = {"type": "task_update", "task": task}
+                yield f"event: task_update\ndata: {orjson.dumps(event_data).decode()}\n\n"
+        finally:
+            task_event_broadcaster.unsubscribe(queue)
+
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
@@ -7,7 +7,7 @@ from schemas.settings import (
     SettingUpdate,
 )
 from shared.db.repositories.settings import SettingsRepository
-from api.deps import get_settings_repo
+from api.deps import RequestSettings, get_request_settings, get_settings_repo
 
 router = APIRouter()
 
@@ -17,9 +17,9 @@ router = APIRouter()
 )
 def get_settings(
     component: str,
-    repo: SettingsRepository = Depends(get_settings_repo),
+    request_settings: RequestSettings = Depends(get_request_settings),
 ):
-    return repo.get_settings(component)
+    return request_settings.get(component)
 
 @router.post("/", response_model=SettingResponse)
 def create_setting(
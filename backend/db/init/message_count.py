@@ -0,0 +1,60 @@
+import sqlalchemy as sa
+
+from core.logging import logger
+
+from shared.db.init.schema import acquire_schema_lock
+from shared.db.session import engine
+
+ADD_MESSAGE_COUNT_COLUMN_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'chat_sessions' AND column_name = 'message_count'
+    ) THEN
+        ALTER TABLE chat_sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0;
+
+        UPDATE chat_sessions s
+        SET message_count = (SELECT COUNT(*) FROM chat_messages m WHERE m.session_id = s.id);
+    END IF;
+END
+$$;
+"""
+
+CREATE_MESSAGE_COUNT_FUNC = """
+CREATE OR REPLACE FUNCTION update_chat_message_count() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE chat_sessions SET message_count = message_count + 1 WHERE id = NEW.session_id;
+    ELSE
+        UPDATE chat_sessions SET message_count = message_count - 1 WHERE id = OLD.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_MESSAGE_COUNT_TRIGGER_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'chat_message_count_trigger') THEN
+        CREATE TRIGGER chat_message_count_trigger
+        AFTER INSERT OR DELETE ON chat_messages
+        FOR EACH ROW
+        EXECUTE FUNCTION update_chat_message_count();
+    END IF;
+END
+$$;
+"""
+
+def create_message_count_trigger():
+    try:
+        with engine.begin() as conn:
+            acquire_schema_lock(conn)
+            conn.execute(sa.text(ADD_MESSAGE_COUNT_COLUMN_SQL))
+            conn.execute(sa.text(CREATE_MESSAGE_COUNT_FUNC))
+            conn.execute(sa.text(CREATE_MESSAGE_COUNT_TRIGGER_SQL))
+
+        logger.info("Chat message count trigger verified/created.")
+    except Exception as e:
+        logger.error(f"Failed to setup chat message count trigger: {e}")
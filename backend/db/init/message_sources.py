@@ -0,0 +1,32 @@
+import sqlalchemy as sa
+
+from core.logging import logger
+
+from shared.db.init.schema import acquire_schema_lock
+from shared.db.session import engine
+
+# chat_messages.sources used to be TEXT holding json.dumps() output
+CONVERT_SOURCES_TO_JSONB_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'chat_messages'
+          AND column_name = 'sources'
+          AND data_type = 'text'
+    ) THEN
+        ALTER TABLE chat_messages ALTER COLUMN sources TYPE JSONB USING sources::jsonb;
+    END IF;
+END
+$$;
+"""
+
+def convert_message_sources_to_jsonb():
+    try:
+        with engine.begin() as conn:
+            acquire_schema_lock(conn)
+            conn.execute(sa.text(CONVERT_SOURCES_TO_JSONB_SQL))
+
+        logger.info("chat_messages.sources verified as JSONB.")
+    except Exception as e:
+        logger.error(f"Failed to convert chat_messages.sources to JSONB: {e}")
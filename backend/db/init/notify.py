@@ -2,6 +2,7 @@ import sqlalchemy as sa
 
 from core.logging import logger
 
+from shared.db.init.schema import acquire_schema_lock
 from shared.db.session import engine
 
 CREATE_NOTIFY_FUNC = """
@@ -26,11 +27,70 @@ END
 $$;
 """
 
+# pg_notify rejects payloads of 8000 bytes or more, and an error raised in the
+# trigger would roll back the worker's status UPDATE. left() counts characters,
+# so multibyte or JSON-escaped text can overflow the 2000-character cuts; the
+# payload is then rebuilt with cuts short enough for any content
+# (600 chars * 6 bytes per \uXXXX escape, twice, plus the other fields)
+CREATE_TASK_EVENT_FUNC = """
+CREATE OR REPLACE FUNCTION notify_task_event() RETURNS TRIGGER AS $$
+DECLARE
+    payload text;
+BEGIN
+    payload := json_build_object(
+        'id', NEW.id,
+        'task_type', NEW.task_type,
+        'status', lower(NEW.status::text),
+        'progress', NEW.progress,
+        'error_message', left(NEW.error_message, 2000),
+        'result', left(NEW.result, 2000),
+        'completed_at', NEW.completed_at
+    )::text;
+
+    IF octet_length(payload) >= 8000 THEN
+        payload := json_build_object(
+            'id', NEW.id,
+            'task_type', NEW.task_type,
+            'status', lower(NEW.status::text),
+            'progress', NEW.progress,
+            'error_message', left(NEW.error_message, 600),
+            'result', left(NEW.result, 600),
+            'completed_at', NEW.completed_at
+        )::text;
+    END IF;
+
+    PERFORM pg_notify('task_events', payload);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TASK_EVENT_TRIGGER_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'task_event_trigger') THEN
+        CREATE TRIGGER task_event_trigger
+        AFTER UPDATE ON pipeline_tasks
+        FOR EACH ROW
+        WHEN (
+            NEW.status IN ('COMPLETED', 'FAILED')
+            AND NEW.completed_at IS NOT NULL
+            AND (OLD.status IS DISTINCT FROM NEW.status OR OLD.completed_at IS NULL)
+        )
+        EXECUTE FUNCTION notify_task_event();
+    END IF;
+END
+$$;
+"""
+
 def create_notify_trigger():
     try:
         with engine.begin() as conn:
+            acquire_schema_lock(conn)
             conn.execute(sa.text(CREATE_NOTIFY_FUNC))
             conn.execute(sa.text(CREATE_TRIGGER_SQL))
+            conn.execute(sa.text(CREATE_TASK_EVENT_FUNC))
+            conn.execute(sa.text(CREATE_TASK_EVENT_TRIGGER_SQL))
             
         logger.info("Postgres notification triggers verified/created.")
     except Exception as e:
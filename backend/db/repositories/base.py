@@ -1,53 +0,0 @@
-from typing import Generic, TypeVar, Optional, List, Type, Any
-
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
-
-from ..session import Base
-
-ModelType = TypeVar("ModelType", bound=Base)
-
-
-class BaseRepository(Generic[ModelType]):
-    def __init__(self, model: Type[ModelType], db: Session):
-        self.model = model
-        self.db = db
-
-    def get(self, id: Any) -> Optional[ModelType]:
-        return self.db.get(self.model, id)
-
-    def get_multi(
-        self,
-        *,
-        skip: int = 0,
-        limit: int = 100,
-    ) -> List[ModelType]:
-        stmt = select(self.model).offset(skip).limit(limit)
-        return list(self.db.scalars(stmt).all())
-
-    def count(self) -> int:
-        stmt = select(func.count()).select_from(self.model)
-        return self.db.scalar(stmt) or 0
-
-    def create(self, obj_in: dict) -> ModelType:
-        db_obj = self.model(**obj_in)
-        self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
-        return db_obj
-
-    def update(self, db_obj: ModelType, obj_in: dict) -> ModelType:
-        for field, value in obj_in.items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
-        self.db.commit()
-        self.db.refresh(db_obj)
-        return db_obj
-
-    def delete(self, id: Any) -> bool:
-        obj = self.get(id)
-        if obj:
-            self.db.delete(obj)
-            self.db.commit()
-            return True
-        return False
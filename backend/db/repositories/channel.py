@@ -1,6 +1,6 @@
 from typing import Optional, List
 
-from sqlalchemy import select
+from sqlalchemy import func, literal, select
 
 from shared.db.models import Channel, Video
 from shared.db.repositories.base import BaseRepository
@@ -10,36 +10,37 @@ class ChannelRepository(BaseRepository[Channel]):
     def __init__(self, db):
         super().__init__(Channel, db)
 
+    def get_multi_rows(self, *, skip: int = 0, limit: int = 100) -> List[dict]:
+        stmt = (
+            select(Channel.id, Channel.name, Channel.url, Channel.created_at)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
+
     def get_by_url(self, url: str) -> Optional[Channel]:
         stmt = select(Channel).where(Channel.url == url)
         return self.db.scalar(stmt)
 
+    def exists_by_url(self, url: str) -> bool:
+        stmt = select(literal(1)).where(Channel.url == url).limit(1)
+        return self.db.scalar(stmt) is not None
+
     def get_with_stats(self, channel_id: int) -> Optional[dict]:
         channel = self.get(channel_id)
         if not channel:
             return None
 
-        video_count = (
-            self.db.query(Video)
-            .filter(Video.channel_id == channel_id)
-            .count()
-        )
-        downloaded_count = (
-            self.db.query(Video)
-            .filter(Video.channel_id == channel_id)
-            .filter(Video.downloaded.is_(True))
-            .count()
-        )
-        transcribed_count = (
-            self.db.query(Video)
-            .filter(Video.channel_id == channel_id)
-            .filter(Video.transcribed.is_(True))
-            .count()
-        )
+        stmt = select(
+            func.count().label("video_count"),
+            func.count().filter(Video.downloaded.is_(True)).label("downloaded_count"),
+            func.count().filter(Video.transcribed.is_(True)).label("transcribed_count"),
+        ).where(Video.channel_id == channel_id)
+        counts = self.db.execute(stmt).one()
 
         return {
             "channel": channel,
-            "video_count": video_count,
-            "downloaded_count": downloaded_count,
-            "transcribed_count": transcribed_count,
+            "video_count": counts.video_count,
+            "downloaded_count": counts.downloaded_count,
+            "transcribed_count": counts.transcribed_count,
         }
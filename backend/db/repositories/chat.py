@@ -1,12 +1,80 @@
-import json
 import uuid
 from typing import List, Optional
 
-from sqlalchemy import select, text
+from sqlalchemy import bindparam, insert, select, text
+from sqlalchemy.orm import aliased, raiseload
 
-from shared.db.models import ChatSession, ChatMessage, Video
+from shared.db.models import ChatSession, ChatMessage, ChatVideo, Video
 from shared.db.repositories.base import BaseRepository
 
+# Drops only the rows that left the set and inserts only the new ones, in one round trip
+UPSERT_CHAT_VIDEOS_SQL = text(
+    """
+    WITH removed AS (
+        DELETE FROM chat_videos
+        WHERE chat_id = :chat_id
+          AND video_id <> ALL(CAST(:video_ids AS text[]))
+    )
+    INSERT INTO chat_videos (chat_id, video_id)
+    SELECT :chat_id, v FROM unnest(CAST(:video_ids AS text[])) AS v
+    ON CONFLICT DO NOTHING
+    """
+)
+
+# Per-request statements are built once; executions only bind parameters, so
+# neither the construct nor its compiled-cache key is regenerated per call
+GET_MESSAGES_STMT = (
+    select(
+        ChatMessage.id,
+        ChatMessage.role,
+        ChatMessage.content,
+        ChatMessage.sources,
+        ChatMessage.created_at,
+    )
+    .where(ChatMessage.session_id == bindparam("session_id"))
+    .order_by(ChatMessage.created_at.asc())
+    .limit(bindparam("limit"))
+)
+
+# Newest `limit` messages, returned oldest-first by the database
+_recent_messages = (
+    select(ChatMessage)
+    .where(ChatMessage.session_id == bindparam("session_id"))
+    .order_by(ChatMessage.created_at.desc())
+    .limit(bindparam("limit"))
+    .subquery()
+)
+_recent_message = aliased(ChatMessage, _recent_messages)
+RECENT_CONTEXT_STMT = (
+    select(_recent_message)
+    .order_by(_recent_message.created_at.asc())
+    .options(raiseload("*"))
+)
+
+# Join through chat_videos directly instead of loading the session first
+CHAT_VIDEOS_STMT = (
+    select(Video)
+    .join(ChatVideo, ChatVideo.video_id == Video.video_id)
+    .where(ChatVideo.chat_id == bindparam("session_id"))
+    .options(raiseload("*"))
+)
+
+INSERT_MESSAGES_STMT = insert(ChatMessage)
+
+
+def _parse_session_id(session_id: str) -> Optional[uuid.UUID]:
+    # Fast path: a canonical 36-char UUID needs no stripping
+    if len(session_id) == 36:
+        try:
+            return uuid.UUID(session_id)
+        except ValueError:
+            pass
+
+    try:
+        return uuid.UUID(session_id.strip().strip('"').strip("'"))
+    except ValueError:
+        return None
+
 
 class ChatSessionRepository(BaseRepository[ChatSession]):
     def __init__(self, db):
@@ -14,58 +82,60 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
 
     def get_or_create(self, question: str, channel_id: int, session_id: Optional[str] = None) -> ChatSession:
         if session_id:
-            try:
-                normalized = session_id.strip().strip('"').strip("'")
-                session_uuid = uuid.UUID(normalized)
+            session_uuid = _parse_session_id(session_id)
+            if session_uuid is not None:
                 session = self.get(session_uuid)
                 if session:
                     return session
-            except ValueError:
-                pass
 
         return self.create({"id": uuid.uuid4(), "title": question, "channel_id": channel_id})
 
-    
+    def get_multi_rows(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[dict]:
+        stmt = (
+            select(
+                ChatSession.id,
+                ChatSession.title,
+                ChatSession.channel_id,
+                ChatSession.created_at,
+                ChatSession.message_count,
+            )
+            .offset(skip)
+            .limit(limit)
+        )
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
+
     def upsert_chat_videos(
         self,
         chat_id: uuid.UUID,
         video_ids: List[str],
     ) -> None:
-        # Remove existing
+        """
+        Make the session's video set equal to `video_ids`.
+        Runs in the caller's transaction; the caller commits.
+        """
         self.db.execute(
-            text("DELETE FROM chat_videos WHERE chat_id = :chat_id"),
-            {"chat_id": chat_id},
+            UPSERT_CHAT_VIDEOS_SQL,
+            {
+                "chat_id": chat_id,
+                "video_ids": list(video_ids),
+            },
         )
 
-        if video_ids:
-            self.db.execute(
-                text(
-                    """
-                    INSERT INTO chat_videos (chat_id, video_id)
-                    SELECT :chat_id, unnest(:video_ids)
-                    """
-                ),
-                {
-                    "chat_id": chat_id,
-                    "video_ids": video_ids,
-                },
-            )
-
-        self.db.commit()
-
     def get_messages(
         self,
         session_id: uuid.UUID,
         *,
         limit: int = 50,
-    ) -> List[ChatMessage]:
-        stmt = (
-            select(ChatMessage)
-            .where(ChatMessage.session_id == session_id)
-            .order_by(ChatMessage.created_at.asc())
-            .limit(limit)
+    ) -> List[dict]:
+        result = self.db.execute(
+            GET_MESSAGES_STMT, {"session_id": session_id, "limit": limit}
         )
-        return list(self.db.scalars(stmt).all())
+        return [dict(row) for row in result.mappings()]
 
     def get_recent_context(
         self,
@@ -73,24 +143,12 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
         *,
         limit: int = 6,
     ) -> List[ChatMessage]:
-        stmt = (
-            select(ChatMessage)
-            .where(ChatMessage.session_id == session_id)
-            .order_by(ChatMessage.created_at.desc())
-            .limit(limit)
-        )
-        messages = list(self.db.scalars(stmt).all())
-        return list(reversed(messages))
+        return self.db.scalars(
+            RECENT_CONTEXT_STMT, {"session_id": session_id, "limit": limit}
+        ).all()
 
     def get_video_by_ids(self, session_id: uuid.UUID) -> List[Video]:
-        stmt = (
-            select(ChatSession)
-            .where(ChatSession.id == session_id)
-        )
-
-        session = self.db.scalars(stmt).first()
-
-        return list(session.videos)
+        return list(self.db.scalars(CHAT_VIDEOS_STMT, {"session_id": session_id}).all())
 
 class ChatMessageRepository(BaseRepository[ChatMessage]):
     def __init__(self, db):
@@ -107,5 +165,22 @@ class ChatMessageRepository(BaseRepository[ChatMessage]):
             "session_id": session_id,
             "role": role,
             "content": content,
-            "sources": json.dumps(sources) if sources else None,
+            "sources": sources or None,
         })
+
+    def add_exchange(
+        self,
+        session_id: uuid.UUID,
+        question: str,
+        answer: str,
+        sources: Optional[List[dict]] = None,
+    ) -> None:
+        """Store a question and its answer with one INSERT and one commit."""
+        self.db.execute(
+            INSERT_MESSAGES_STMT,
+            [
+                {"session_id": session_id, "role": "user", "content": question, "sources": None},
+                {"session_id": session_id, "role": "assistant", "content": answer, "sources": sources or None},
+            ],
+        )
+        self.db.commit()
@@ -1,30 +1,80 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import String, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import raiseload
 
-from shared.db.models import Channel, Video
+from shared.db.models import Chunk, Segment, Video
 from shared.db.repositories.base import BaseRepository
 
 
+VIDEO_LIST_COLUMNS = (
+    Video.video_id,
+    Video.title,
+    Video.description,
+    Video.channel_id,
+    Video.published_at,
+    Video.duration,
+    Video.downloaded,
+    Video.transcribed,
+    Video.created_at,
+)
+
+PENDING_STREAM_BATCH_SIZE = 1000
+
+# Built once at import; each call only binds :video_id
+_chunk_count = (
+    select(func.count())
+    .select_from(Chunk)
+    .where(Chunk.video_id == Video.video_id)
+    .scalar_subquery()
+)
+_segment_count = (
+    select(func.count())
+    .select_from(Segment)
+    .where(Segment.video_id == Video.video_id)
+    .scalar_subquery()
+)
+VIDEO_WITH_COUNTS_STMT = (
+    select(Video, _chunk_count, _segment_count)
+    .where(Video.video_id == bindparam("video_id"))
+    .options(raiseload("*"))
+)
+
+
 class VideoRepository(BaseRepository[Video]):
     def __init__(self, db):
         super().__init__(Video, db)
 
-    def get_by_channel(
+    def get_multi_rows(
         self,
-        channel_id: int,
+        channel_id: Optional[int] = None,
         *,
         skip: int = 0,
         limit: int = 100,
-    ) -> List[Video]:
-        stmt = (
-            select(Video)
-            .where(Video.channel_id == channel_id)
-            .order_by(Video.published_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        return list(self.db.scalars(stmt).all())
+    ) -> List[dict]:
+        stmt = select(*VIDEO_LIST_COLUMNS)
+        if channel_id:
+            stmt = (
+                stmt.where(Video.channel_id == channel_id)
+                .order_by(Video.published_at.desc())
+            )
+        stmt = stmt.offset(skip).limit(limit)
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
+
+    def get_with_counts(self, video_id: str) -> Optional[dict]:
+        row = self.db.execute(
+            VIDEO_WITH_COUNTS_STMT, {"video_id": video_id}
+        ).one_or_none()
+        if not row:
+            return None
+
+        video, chunks, segments = row
+        return {
+            "video": video,
+            "chunk_count": chunks,
+            "segment_count": segments,
+        }
 
     def get_chat_video_ids(
         self,
@@ -32,32 +82,35 @@ class VideoRepository(BaseRepository[Video]):
         video_ids: List[str],
         limit: int = 200,
     ) -> List[str]:
-
-        query = (
-            self.db.query(Video.video_id)
-            .join(Channel, Channel.id == Video.channel_id)
-            .filter(Channel.id == channel_id)
-        )
+        stmt = select(Video.video_id).where(Video.channel_id == channel_id)
 
         if video_ids:
-            query = query.filter(Video.video_id.in_(video_ids))
+            # = ANY(:video_ids) keeps one statement shape whatever the list size
+            stmt = stmt.where(
+                Video.video_id == any_(bindparam("video_ids", video_ids, type_=ARRAY(String)))
+            )
         else:
-            query = query.limit(limit)
+            stmt = stmt.limit(limit)
 
-        rows = query.all()
-        return [row.video_id for row in rows]
+        return list(self.db.scalars(stmt))
 
-
-    def get_pending_download(self, channel_id: Optional[int] = None) -> List[Video]:
-        stmt = select(Video).where(Video.downloaded.is_(False))
+    def get_pending_download(self, channel_id: Optional[int] = None) -> Iterator[dict]:
+        stmt = select(*VIDEO_LIST_COLUMNS).where(Video.downloaded.is_(False))
         if channel_id:
             stmt = stmt.where(Video.channel_id == channel_id)
-        return list(self.db.scalars(stmt).all())
+        return self._stream_rows(stmt)
 
-    def get_pending_transcription(self) -> List[Video]:
+    def get_pending_transcription(self) -> Iterator[dict]:
         stmt = (
-            select(Video)
+            select(*VIDEO_LIST_COLUMNS)
             .where(Video.downloaded.is_(True))
             .where(Video.transcribed.is_(False))
         )
-        return list(self.db.scalars(stmt).all())
+        return self._stream_rows(stmt)
+
+    def _stream_rows(self, stmt) -> Iterator[dict]:
+        # Server-side cursor fetched in partitions instead of one big buffer
+        result = self.db.execute(
+            stmt.execution_options(yield_per=PENDING_STREAM_BATCH_SIZE)
+        )
+        return (dict(row) for row in result.mappings())
@@ -1,17 +1,22 @@
 
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from core.config import BACKEND_SETTINGS_SPEC, settings
 from core.logging import logger
 from core.exceptions import AppException
 from api.router import api_router
 from db.init.notify import create_notify_trigger
+from db.init.message_count import create_message_count_trigger
+from db.init.message_sources import convert_message_sources_to_jsonb
+from services.task_events import task_event_broadcaster
 
 from shared.db.init.poblate_settings_table import populate_settings
+from shared.db.init.schema import create_schema
 from shared.db.session import get_db_context
 from shared.utils.utils import print_settings
 
@@ -23,6 +28,13 @@ async def lifespan(app: FastAPI):
     # 0. Print settings
     print_settings(logger, settings, "Backend settings:", {"openai_api_key", "database_url"})
 
+    # 0.1 Sync endpoints and streaming generators run in the AnyIO threadpool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    # 0.2 Create extension and tables (if missing); the bit-quantized
+    # indexes only exist while that retrieval mode is enabled
+    create_schema(binary_quantized_indexes=settings.rag_binary_candidates > 0)
+
     # 1. Poblate settings (if empty) with .env variables
     with get_db_context() as db:
         populate_settings(
@@ -35,9 +47,19 @@ async def lifespan(app: FastAPI):
     # 2. Setup Postgres LISTEN/NOTIFY Triggers
     create_notify_trigger()
 
+    # 2.1 Keep chat_sessions.message_count in sync with chat_messages
+    create_message_count_trigger()
+
+    # 2.2 Store chat message sources as JSONB
+    convert_message_sources_to_jsonb()
+
+    # 3. Fan out task_events notifications to SSE clients
+    task_event_broadcaster.start()
+
     yield
     
     logger.info("Shutting down application...")
+    task_event_broadcaster.stop()
 
 
 app = FastAPI(
@@ -47,6 +69,7 @@ app = FastAPI(
     docs_url=f"{settings.api_v1_prefix}/docs",
     redoc_url=f"{settings.api_v1_prefix}/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
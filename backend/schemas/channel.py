@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, HttpUrl
 
 
 class ChannelBase(BaseModel):
@@ -22,11 +22,10 @@ class ChannelResponse(ChannelBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChannelWithStats(ChannelResponse):
-    video_count: int
-    downloaded_count: int
-    transcribed_count: int
+    video_count: int = 0
+    downloaded_count: int = 0
+    transcribed_count: int = 0
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from schemas.video import VideoResponse
 
 class ChatMessageBase(BaseModel):
@@ -14,15 +14,6 @@ class ChatMessageCreate(BaseModel):
     content: str
 
 
-class ChatMessageResponse(ChatMessageBase):
-    id: int
-    created_at: datetime
-    sources: Optional[str] = None
-
-    class Config:
-        from_attributes = True
-
-
 class ChatSource(BaseModel):
     video_id: str
     start: float
@@ -31,6 +22,14 @@ class ChatSource(BaseModel):
     score: float
 
 
+class ChatMessageResponse(ChatMessageBase):
+    id: int
+    created_at: datetime
+    sources: Optional[List[ChatSource]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ChatSessionResponse(BaseModel):
     id: UUID
     title: Optional[str] = None
@@ -38,8 +37,7 @@ class ChatSessionResponse(BaseModel):
     created_at: datetime
     message_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChatSessionDetail(ChatSessionResponse):
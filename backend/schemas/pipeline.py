@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Literal, Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from shared.db.models import TaskStatus
 
@@ -52,8 +52,7 @@ class PipelineTaskResponse(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PaginatedTasksResponse(BaseModel):
     items: list[PipelineTaskResponse]
@@ -61,6 +60,7 @@ class PaginatedTasksResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 
 class PipelineStatsResponse(BaseModel):
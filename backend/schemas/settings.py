@@ -1,5 +1,5 @@
 from typing import Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SettingResponse(BaseModel):
@@ -10,8 +10,7 @@ class SettingResponse(BaseModel):
     value_type: str
     description: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SettingCreate(BaseModel):
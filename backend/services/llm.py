@@ -1,15 +1,47 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Generator
+
+import httpx
 from openai import OpenAI
 
 from core.config import settings
 from core.logging import logger
 
+# Fail fast on connect, but leave reads as long as the OpenAI client's own
+# default: long non-streaming calls (global summary) take minutes
+LLM_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+LLM_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+LLM_CACHE_SIZE = 1024
+# Above this answers are too random to be worth reusing
+LLM_CACHE_MAX_TEMPERATURE = 0.5
+
 
 class LLMService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # Pooled keep-alive client; HTTP/2 multiplexes concurrent (streaming)
+        # requests over one connection instead of a handshake per call
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=LLM_HTTP_LIMITS,
+                timeout=LLM_HTTP_TIMEOUT,
+            ),
+        )
         self.model = settings.openai_model
 
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_key(self, prompt: str, system_prompt: str, temperature: float) -> str:
+        raw = repr((self.model, system_prompt, prompt, temperature)).encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
     def generate(
         self,
         prompt: str,
@@ -17,6 +49,17 @@ class LLMService:
         system_prompt: str = "You are a helpful assistant.",
         temperature: float = 0.2,
     ) -> str:
+        cacheable = temperature <= LLM_CACHE_MAX_TEMPERATURE
+        if cacheable:
+            key = self._cache_key(prompt, system_prompt, temperature)
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return cached
+                self.cache_misses += 1
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -26,11 +69,31 @@ class LLMService:
                 ],
                 temperature=temperature,
             )
-            return response.choices[0].message.content.strip()
+            answer = response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
             raise
 
+        if cacheable:
+            with self._cache_lock:
+                self._cache[key] = answer
+                if len(self._cache) > LLM_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+        return answer
+
+    def evict(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str = "You are a helpful assistant.",
+        temperature: float = 0.2,
+    ) -> None:
+        """Drop the cached answer for these arguments, if any."""
+        key = self._cache_key(prompt, system_prompt, temperature)
+        with self._cache_lock:
+            self._cache.pop(key, None)
+
     def generate_stream(
         self,
         prompt: str,
@@ -1,5 +1,10 @@
 import time
-import json
+import re
+
+import orjson
+import tiktoken
+
+from functools import lru_cache
 
 from typing import Generator, List, Literal, Optional
 from uuid import UUID
@@ -19,42 +24,102 @@ from core.logging import logger
 from db.repositories.video import VideoRepository
 from services.llm import llm_service
 from services.retriever import retriever_service
+from services.task_events import task_event_broadcaster
+
+
+VIDEO_SUMMARIES_SQL = text(
+    """
+    WITH ranked AS (
+        SELECT
+            video_id, chunk_index, summary, start_time, end_time,
+            row_number() OVER (PARTITION BY video_id ORDER BY chunk_index) AS rn
+        FROM chunks
+        WHERE video_id = ANY(:video_ids)
+          AND summary IS NOT NULL
+          AND btrim(summary) <> ''
+    )
+    SELECT
+        video_id,
+        string_agg('- ' || summary, E'\\n' ORDER BY chunk_index) AS summaries,
+        array_agg(start_time ORDER BY chunk_index) AS starts,
+        array_agg(end_time ORDER BY chunk_index) AS ends,
+        array_agg(
+            'https://www.youtube.com/watch?v=' || video_id
+                || '&t=' || floor(start_time)::int || 's'
+            ORDER BY chunk_index
+        ) AS urls
+    FROM ranked
+    WHERE rn <= :max_per_video
+    GROUP BY video_id
+    ORDER BY video_id
+    """
+)
+
+SUMMARY_TOKEN_BUDGET = 12000
+
+
+# NDJSON framing for streamed content tokens, so each token only needs its
+# string JSON-encoded
+CONTENT_EVENT_PREFIX = b'{"type":"content","data":'
+CONTENT_EVENT_SUFFIX = b'}\n'
+
+# Fallback re-check backoff in seconds: 20ms, 40ms, 80ms, ... capped at 500ms
+EMBEDDING_RECHECK_INITIAL = 0.02
+EMBEDDING_RECHECK_MAX = 0.5
+
+# Unambiguous phrasings resolved locally, most specific first. A question
+# matching several rules ("how many videos have summaries") or none is sent
+# to the LLM
+_INTENT_RULES = (
+    (
+        "METADATA",
+        re.compile(
+            r"\b(cu[aá]ntos (v[ií]deos|canales)|how many (videos|channels))\b",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "CONTENT_GLOBAL",
+        re.compile(
+            r"\b(resum[a-z]*|summar[a-z]*|overview|main points|key points"
+            r"|puntos (principales|clave))\b",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+# Sent as the system message so the question is the only part that varies
+INTENT_SYSTEM_PROMPT = """
+Classify the user question into one of the categories:
 
+- METADATA: Questions about the video library itself.
+- CONTENT: Questions about specific topics discussed in the videos.
+- CONTENT_GLOBAL: Questions asking for summaries, main points, or overviews.
 
-def youtube_timestamp_url(video_id: str, start_seconds: float) -> str:
-    return f"https://www.youtube.com/watch?v={video_id}&t={int(start_seconds)}s"
+Return ONLY one of: METADATA, CONTENT, CONTENT_GLOBAL.
+""".strip()
 
 
-def build_prompt(
-    question: str,
-    chunks: List[dict],
-    chat_context: List,
-) -> str:
-    chat_block = ""
-    if chat_context:
-        chat_block = "Conversation so far:\n"
-        for msg in chat_context:
-            role = "User" if msg.role == "user" else "Assistant"
-            chat_block += f"{role}: {msg.content}\n"
-        chat_block += "\n"
-
-    context_blocks = []
-    for i, ch in enumerate(chunks, start=1):
-        block = (
-            f"[Context {i} | {ch['video_id']} | "
-            f"{ch['start']:.1f}s–{ch['end']:.1f}s]\n"
-        )
+def classify_intent(question: str) -> Literal["METADATA", "CONTENT", "CONTENT_GLOBAL"]:
+    matches = [intent for intent, pattern in _INTENT_RULES if pattern.search(question)]
+    if len(matches) == 1:
+        return matches[0]
 
-        if ch.get("summary"):
-            block += f"Summary:\n{ch['summary'].strip()}\n\n"
+    # Repeated questions are answered from llm_service's response cache
+    response = llm_service.generate(
+        question,
+        system_prompt=INTENT_SYSTEM_PROMPT,
+    ).strip().upper()
 
-        block += f"Transcript:\n{ch['text'].strip()}"
+    if response in {"METADATA", "CONTENT", "CONTENT_GLOBAL"}:
+        return response
 
-        context_blocks.append(block)
+    return "CONTENT"
 
-    context = "\n\n".join(context_blocks)
 
-    return f"""
+# Static instructions go in the system message so every question shares the
+# same prompt prefix, which lets OpenAI's prompt caching reuse it
+RAG_SYSTEM_PROMPT = """
 You are an expert assistant answering questions strictly using the provided video context.
 
 Your goal is to produce answers that are:
@@ -81,29 +146,77 @@ Answer structure guidelines:
 - Use bullet points or numbered lists when appropriate.
 - When multiple fragments contribute, synthesize them coherently.
 - Avoid redundancy unless it improves clarity.
+""".strip()
 
-Conversation context:
-{chat_block}
-
-Video context:
-{context}
+GLOBAL_SUMMARY_SYSTEM_PROMPT = """
+You are given summarized segments from one or more YouTube videos.
 
-User question:
-{question}
+Your task is to identify the main points discussed across the selected videos
+and present them as a concise, structured list of bullet points in Spanish.
 
-Answer:
+Rules:
+- Do NOT invent information.
+- Base your answer strictly on the provided summaries.
+- Group related ideas across videos when appropriate.
+- Focus on recurring themes, arguments, and conclusions.
 """.strip()
 
 
+def content_event(token: str) -> bytes:
+    return CONTENT_EVENT_PREFIX + orjson.dumps(token) + CONTENT_EVENT_SUFFIX
+
+
+def ndjson_event(event: dict) -> bytes:
+    return orjson.dumps(event) + b"\n"
+
+
+@lru_cache
+def get_encoding(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def build_prompt(
+    question: str,
+    chunks: List[dict],
+    chat_context: List,
+) -> str:
+    chat_block = ""
+    if chat_context:
+        chat_block = "Conversation so far:\n" + "".join(
+            f"{'User' if msg.role == 'user' else 'Assistant'}: {msg.content}\n"
+            for msg in chat_context
+        ) + "\n"
+
+    # Chunk text and summaries are stripped when the worker stores them
+    context = "\n\n".join(
+        f"[Context {i} | {ch['video_id']} | {ch['start']:.1f}s–{ch['end']:.1f}s]\n"
+        + (f"Summary:\n{ch['summary']}\n\n" if ch.get("summary") else "")
+        + f"Transcript:\n{ch['text']}"
+        for i, ch in enumerate(chunks, start=1)
+    )
+
+    # Instructions live in RAG_SYSTEM_PROMPT; only the per-turn parts are
+    # formatted here, in one pass and without a trailing strip() copy
+    return (
+        f"Conversation context:\n{chat_block}\n\n"
+        f"Video context:\n{context}\n\n"
+        f"User question:\n{question}\n\n"
+        "Answer:"
+    )
+
+
 class RAGService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, settings: Optional[dict] = None):
         self.db           = db
         self.sql_agent    = SQLAgentService(db)
         self.session_repo = ChatSessionRepository(db)
         self.message_repo = ChatMessageRepository(db)
         self.video_repo   = VideoRepository(db)
         self.chat_repo    = ChatSessionRepository(db)
-        self.settings     = SettingsRepository(db).get_settings("BACKEND")
+        self.settings     = settings if settings is not None else SettingsRepository(db).get_settings("BACKEND")
 
     def ask_stream(
         self,
@@ -112,7 +225,7 @@ class RAGService:
         video_ids: List[str],
         task_id: UUID,
         session_id: Optional[UUID] = None,
-    ) -> Generator[str, None, None]:
+    ) -> Generator[bytes, None, None]:
         # 1. Setup Session
         session = self.session_repo.get_or_create(
             question,
@@ -122,37 +235,45 @@ class RAGService:
 
         if video_ids:
             self.chat_repo.upsert_chat_videos(session.id, video_ids)
+            self.db.commit()
 
         # Send Session ID event immediately
-        yield json.dumps({"type": "session_id", "data": str(session.id)}) + "\n"
+        yield ndjson_event({"type": "session_id", "data": str(session.id)})
 
         # 2. Logic (Intent & Retrieval)
         intent = self._classify_intent(question)
         video_ids = self.video_repo.get_chat_video_ids(channel_id, video_ids)
         
-        answer_text = ""
+        # Streamed tokens are collected and joined once at the end
+        answer_parts: List[str] = []
         sources = []
 
         if intent == "METADATA":
             logger.info("Routing - METADATA")
-            answer_text = self._handle_metadata_query(question)
-            yield json.dumps({"type": "content", "data": answer_text}) + "\n"
+            answer_parts.append(self._handle_metadata_query(question))
+            yield content_event(answer_parts[-1])
 
         elif intent == "CONTENT_GLOBAL":
             for event in self.handle_content_global(video_ids=video_ids):
                 
                 if event["type"] == "sources":
                     sources = event["data"]
-                    yield json.dumps(event) + "\n"
+                    yield ndjson_event(event)
                 
                 elif event["type"] == "content":
-                    answer_text += event["data"]
-                    yield json.dumps(event) + "\n"
+                    answer_parts.append(event["data"])
+                    yield content_event(event["data"])
 
         else:  # CONTENT (RAG)
             logger.info("Routing - CONTENT")
+            # Read the history while the worker is still embedding the question;
+            # a fresh session has none, so skip the query entirely
+            chat_context = (
+                self.session_repo.get_recent_context(session.id)
+                if session.message_count
+                else []
+            )
             query_embedding = self._wait_for_embedding(task_id)
-            chat_context = self.session_repo.get_recent_context(session.id)
 
             chunks = retriever_service.search_hybrid(
                 self.db,
@@ -161,45 +282,47 @@ class RAGService:
                 top_k=self.settings["rag_top_k"],
                 vector_weight=self.settings["rag_vector_weight"],
                 text_weight=self.settings["rag_text_weight"],
+                # Settings tables seeded before this key existed do not have it
+                binary_candidates=self.settings.get("rag_binary_candidates", settings.rag_binary_candidates),
                 target_index="summary",
                 video_ids=video_ids,
             )
 
             if not chunks:
-                answer_text = "I couldn't find any relevant information in the selected videos."
-                yield json.dumps({"type": "content", "data": answer_text}) + "\n"
+                answer_parts.append("I couldn't find any relevant information in the selected videos.")
+                yield content_event(answer_parts[-1])
             else:
-                # Prepare sources
+                # Prepare sources (timestamp URLs come formatted from SQL)
                 sources = [
                     {
                         "video_id": ch["video_id"],
                         "start": ch["start"],
                         "end": ch["end"],
-                        "url": youtube_timestamp_url(ch["video_id"], ch["start"]),
+                        "url": ch["url"],
                         "score": ch["score"],
                     }
                     for ch in chunks
                 ]
                 
                 # Send Sources event
-                yield json.dumps({"type": "sources", "data": sources}) + "\n"
+                yield ndjson_event({"type": "sources", "data": sources})
 
                 # Generate Stream
                 prompt = build_prompt(question, chunks, chat_context)
                 stream_generator = llm_service.generate_stream(
                     prompt, 
-                    system_prompt=prompt, 
+                    system_prompt=RAG_SYSTEM_PROMPT,
                     temperature=self.settings["llm_temperature"]
                 )
 
                 for token in stream_generator:
-                    answer_text += token
+                    answer_parts.append(token)
                     # Send Content Token event
-                    yield json.dumps({"type": "content", "data": token}) + "\n"
+                    yield content_event(token)
 
-        # 3. Persistence (Save to DB after stream finishes)
-        self.message_repo.add_message(session.id, "user", question)
-        self.message_repo.add_message(session.id, "assistant", answer_text, sources)
+        # 3. Persistence: committed before the stream ends, so a follow-up
+        # question always sees this exchange (and an up-to-date message_count)
+        self.message_repo.add_exchange(session.id, question, "".join(answer_parts), sources)
 
 
     def handle_content_global(
@@ -209,123 +332,94 @@ class RAGService:
     ):
         
         rows = self.db.execute(
-            text(
-                """
-                SELECT video_id, chunk_index, summary, start_time, end_time
-                FROM chunks
-                WHERE video_id = ANY(:video_ids)
-                  AND summary IS NOT NULL
-                ORDER BY video_id, chunk_index
-                """
-            ),
-            {"video_ids": video_ids},
+            VIDEO_SUMMARIES_SQL,
+            {"video_ids": video_ids, "max_per_video": max_summaries_per_video},
         ).fetchall()
 
         if not rows:
             content = (
                 "I do not have enough summarized information to extract the main "
-                "points from the selected videos.",
-                [] 
+                "points from the selected videos."
             )
             yield {"type": "content", "data": content}
+            return
 
+        # Stop adding videos once the prompt would outgrow the token budget
+        encoding = get_encoding(settings.openai_model)
         summaries = []
         sources = []
-        current_video = None
-        count = 0
+        tokens = 0
 
         for r in rows:
-            if r.video_id != current_video:
-                current_video = r.video_id
-                count = 0
-                summaries.append(f"\nVideo {r.video_id}:")
-
-            if count < max_summaries_per_video and r.summary and r.summary.strip():
-                summaries.append(f"- {r.summary}")
-                
-                sources.append({
+            block = f"\nVideo {r.video_id}:\n{r.summaries}"
+            tokens += len(encoding.encode(block))
+            if summaries and tokens > SUMMARY_TOKEN_BUDGET:
+                break
+
+            summaries.append(block)
+            sources.extend(
+                {
                     "video_id": r.video_id,
-                    "start": r.start_time,
-                    "end": r.end_time,
-                    "url": youtube_timestamp_url(r.video_id, r.start_time),
+                    "start": start,
+                    "end": end,
+                    "url": url,
                     "score": 1.0,
-                })
-                
-                count += 1
+                }
+                for start, end, url in zip(r.starts, r.ends, r.urls)
+            )
 
         summaries_text = "\n".join(summaries)
 
-        prompt = f"""
-You are given summarized segments from one or more YouTube videos.
-
-Your task is to identify the main points discussed across the selected videos
-and present them as a concise, structured list of bullet points in Spanish.
-
-Rules:
-- Do NOT invent information.
-- Base your answer strictly on the provided summaries.
-- Group related ideas across videos when appropriate.
-- Focus on recurring themes, arguments, and conclusions.
-
-Summaries:
-{summaries_text}
-
-Main points:
-""".strip()
+        prompt = f"Summaries:\n{summaries_text}\n\nMain points:"
 
         yield {"type": "sources", "data": sources}
 
-        answer_text = ""
-        stream_generator = llm_service.generate_stream(prompt, temperature=self.settings["llm_temperature"])
+        stream_generator = llm_service.generate_stream(
+            prompt,
+            system_prompt=GLOBAL_SUMMARY_SYSTEM_PROMPT,
+            temperature=self.settings["llm_temperature"],
+        )
 
+        # The caller accumulates the answer
         for token in stream_generator:
-            answer_text += token
             yield {"type": "content", "data": token}
 
 
     def _wait_for_embedding(self, task_id: UUID) -> list[float]:
         timeout = 30
-        start_time = time.time()
-
-        while True:
-            row = self.db.execute(
-                select(PipelineTask.status, PipelineTask.result)
-                .where(PipelineTask.id == task_id)
-            ).one()
-
-            if row.status == "completed" and row.result:
-                return row.result
-
-            if row.status == "failed":
-                raise RuntimeError("Embedding task failed in worker.")
-
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timed out waiting for embedding worker.")
-
-            time.sleep(0.2)
+        deadline = time.monotonic() + timeout
+
+        # Registered before the first read so a fast completion is not missed
+        done = task_event_broadcaster.register_waiter(task_id)
+        delay = EMBEDDING_RECHECK_INITIAL
+        try:
+            while True:
+                row = self.db.execute(
+                    select(PipelineTask.status, PipelineTask.result)
+                    .where(PipelineTask.id == task_id)
+                ).one()
+
+                if row.status == "completed" and row.result:
+                    return row.result
+
+                if row.status == "failed":
+                    raise RuntimeError("Embedding task failed in worker.")
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for embedding worker.")
+
+                # Woken by the task_events NOTIFY; the backed-off re-check only
+                # matters if the listener connection is down
+                done.wait(min(remaining, delay))
+                delay = min(delay * 2, EMBEDDING_RECHECK_MAX)
+        finally:
+            task_event_broadcaster.unregister_waiter(task_id)
 
     def _classify_intent(self, question: str) -> Literal["METADATA", "CONTENT", "CONTENT_GLOBAL"]:
-        prompt = f"""
-Classify the following user question into one of the categories:
-
-- METADATA: Questions about the video library itself.
-- CONTENT: Questions about specific topics discussed in the videos.
-- CONTENT_GLOBAL: Questions asking for summaries, main points, or overviews.
-
-Return ONLY one of: METADATA, CONTENT, CONTENT_GLOBAL.
-
-Question:
-{question}
-
-Category:
-""".strip()
-
-        response = llm_service.generate(prompt).strip().upper()
-
-        if response in {"METADATA", "CONTENT", "CONTENT_GLOBAL"}:
-            return response
-
-        return "CONTENT"
+        # Case and whitespace do not change the intent, so fold them into one
+        # LLM cache entry
+        return classify_intent(" ".join(question.lower().split()))
 
     def _handle_metadata_query(self, question: str) -> str:
         return self.sql_agent.handle(question)
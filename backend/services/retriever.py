@@ -1,7 +1,96 @@
 from typing import List, Optional
-from sqlalchemy import text
+
+import orjson
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
+from shared.db.models import EMBEDDING_DIM, Chunk
+
+
+def _build_vector_results_sql(vector_col: str, binary: bool) -> str:
+    # Embeddings are L2-normalized, so <#> (negative inner product) ranks like
+    # cosine distance without the sqrt of <->; its negation is the similarity
+    if not binary:
+        return f"""
+        vector_results AS (
+            SELECT id, {vector_col} <#> (:query_embedding)::vector AS vector_distance
+            FROM chunks
+            WHERE {vector_col} IS NOT NULL
+              AND video_id = ANY(:video_ids)
+            ORDER BY vector_distance
+            LIMIT :top_k
+        )"""
+
+    # Two stages: over-fetch by Hamming distance on the bit-quantized
+    # expression index, then rerank just those candidates on full vectors
+    return f"""
+        vector_candidates AS (
+            SELECT id, {vector_col}
+            FROM chunks
+            WHERE {vector_col} IS NOT NULL
+              AND video_id = ANY(:video_ids)
+            ORDER BY binary_quantize({vector_col})::bit({EMBEDDING_DIM})
+                <~> binary_quantize((:query_embedding)::vector)
+            LIMIT :binary_candidates
+        ),
+        vector_results AS (
+            SELECT id, {vector_col} <#> (:query_embedding)::vector AS vector_distance
+            FROM vector_candidates
+            ORDER BY vector_distance
+            LIMIT :top_k
+        )"""
+
+
+def _build_hybrid_search_sql(vector_col: str, ts_vector_col: str, binary: bool = False):
+    # Candidates carry only id and score; the weighted fusion, ordering and
+    # final LIMIT run in Postgres so only top_k full rows are returned
+    return text(f"""
+        WITH {_build_vector_results_sql(vector_col, binary)},
+        text_results AS (
+            SELECT id, ts_rank({ts_vector_col}, plainto_tsquery('spanish', :query)) AS text_rank
+            FROM chunks
+            WHERE {ts_vector_col} @@ plainto_tsquery('spanish', :query)
+              AND video_id = ANY(:video_ids)
+            ORDER BY text_rank DESC
+            LIMIT :top_k
+        ),
+        scored AS (
+            SELECT
+                id,
+                :vector_weight * COALESCE(-v.vector_distance, 0)
+                    + :text_weight * COALESCE(t.text_rank, 0) AS score
+            FROM vector_results v
+            FULL OUTER JOIN text_results t USING (id)
+            ORDER BY score DESC
+            LIMIT :top_k
+        )
+        SELECT
+            c.id, c.video_id, c.chunk_index, c.start_time, c.end_time, c.text, c.summary, s.score,
+            'https://www.youtube.com/watch?v=' || c.video_id
+                || '&t=' || floor(c.start_time)::int || 's' AS url
+        FROM scored s
+        JOIN chunks c ON c.id = s.id
+        ORDER BY s.score DESC
+    """).bindparams(
+        # Typed binds: the embedding goes through pgvector's own serializer and
+        # the statement compiles the same way on every call
+        bindparam("query_embedding", type_=Chunk.embedding.type),
+        bindparam("video_ids", type_=ARRAY(String)),
+    )
+
+
+# Built once per (index, binary) so the statements are not re-assembled on every search
+HYBRID_SEARCH_SQL = {
+    (index, binary): _build_hybrid_search_sql(vector_col, ts_vector_col, binary)
+    for index, vector_col, ts_vector_col in (
+        ("chunks", "embedding", "search_vector"),
+        ("summaries", "summary_embedding", "summary_search_vector"),
+    )
+    for binary in (False, True)
+}
+
+
 class RetrieverService:
     _instance: Optional["RetrieverService"] = None
 
@@ -16,75 +105,37 @@ class RetrieverService:
         text_weight: float = 0.3,
         target_index: str = "chunks",
         video_ids: List[str],
+        binary_candidates: int = 0,
     ) -> List[dict]:
+        """
+        `binary_candidates` > 0 switches the vector side to a bit-quantized
+        over-fetch of that many rows, reranked on the full embeddings.
+        """
 
         if not video_ids:
             return []
 
-        if not query_embedding:
-            formatted_embedding = "[]"
-        elif isinstance(query_embedding, str):
-            formatted_embedding = query_embedding.replace("{", "[").replace("}", "]")
-        else:
-            formatted_embedding = str(query_embedding)
-
-        if target_index == "summaries":
-            vector_col = "summary_embedding"
-            ts_vector_col = "summary_search_vector"
-        else:
-            vector_col = "embedding"
-            ts_vector_col = "search_vector"
-
-        sql = f"""
-            WITH vector_results AS (
-                SELECT id, video_id, chunk_index, start_time, end_time, text, summary,
-                       {vector_col} <-> (:query_embedding)::vector AS vector_distance
-                FROM chunks
-                WHERE {vector_col} IS NOT NULL
-                  AND video_id = ANY(:video_ids)
-                ORDER BY vector_distance
-                LIMIT :top_k
-            ),
-            text_results AS (
-                SELECT id, video_id, chunk_index, start_time, end_time, text, summary,
-                       ts_rank({ts_vector_col}, plainto_tsquery('spanish', :query)) AS text_rank
-                FROM chunks
-                WHERE {ts_vector_col} @@ plainto_tsquery('spanish', :query)
-                  AND video_id = ANY(:video_ids)
-                ORDER BY text_rank DESC
-                LIMIT :top_k
-            )
-            SELECT
-                COALESCE(v.id, t.id) AS id,
-                COALESCE(v.video_id, t.video_id) AS video_id,
-                COALESCE(v.chunk_index, t.chunk_index) AS chunk_index,
-                COALESCE(v.start_time, t.start_time) AS start_time,
-                COALESCE(v.end_time, t.end_time) AS end_time,
-                COALESCE(v.text, t.text) AS text,
-                COALESCE(v.summary, t.summary) AS summary,
-                v.vector_distance,
-                t.text_rank
-            FROM vector_results v
-            FULL OUTER JOIN text_results t ON v.id = t.id
-        """
+        if isinstance(query_embedding, str):
+            query_embedding = orjson.loads(query_embedding.replace("{", "[").replace("}", "]"))
+
+        binary = binary_candidates > 0
+        stmt = HYBRID_SEARCH_SQL[("summaries" if target_index == "summaries" else "chunks", binary)]
 
         results = db.execute(
-            text(sql),
+            stmt,
             {
-                "query_embedding": formatted_embedding,
+                "query_embedding": query_embedding or None,
                 "query": query,
                 "top_k": top_k,
+                "vector_weight": vector_weight,
+                "text_weight": text_weight,
                 "video_ids": video_ids,
+                "binary_candidates": max(binary_candidates, top_k),
             },
-        ).fetchall()
-
-        merged = []
-        for r in results:
-            vector_score = (1 - r.vector_distance) if r.vector_distance is not None else 0
-            text_score = r.text_rank or 0
-            final_score = vector_weight * vector_score + text_weight * text_score
+        )
 
-            merged.append({
+        return [
+            {
                 "id": r.id,
                 "video_id": r.video_id,
                 "chunk_index": r.chunk_index,
@@ -92,10 +143,10 @@ class RetrieverService:
                 "end": r.end_time,
                 "text": r.text,
                 "summary": r.summary,
-                "score": final_score,
-            })
-
-        merged.sort(key=lambda x: x["score"], reverse=True)
-        return merged[:top_k]
+                "score": r.score,
+                "url": r.url,
+            }
+            for r in results
+        ]
 
 retriever_service = RetrieverService()
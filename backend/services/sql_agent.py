@@ -1,15 +1,14 @@
 import logging
-from services.llm import LLMService
+
+import sqlglot
+from sqlglot import exp
+
+from services.llm import llm_service
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-class SQLAgentService:
-    def __init__(self, db: Session):
-        self.db = db
-        self.llm = LLMService()
-        self.logger = logging.getLogger("SQLAgentService")
-        self.schema_context = """
+SCHEMA_CONTEXT = """
         Tables:
         1. videos (
             video_id STRING,
@@ -43,6 +42,70 @@ class SQLAgentService:
         )
         """
 
+_READ_STATEMENTS = (exp.Select, exp.Union, exp.Intersect, exp.Except)
+_WRITE_EXPRESSIONS = (
+    exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop,
+    exp.Alter, exp.Command,
+)
+
+
+def is_read_only_query(sql_query: str) -> bool:
+    """True for a single SELECT-like statement with no writes anywhere in it."""
+    try:
+        statements = [s for s in sqlglot.parse(sql_query, read="postgres") if s is not None]
+    except sqlglot.errors.ParseError:
+        return False
+
+    if len(statements) != 1 or not isinstance(statements[0], _READ_STATEMENTS):
+        return False
+
+    # Data-modifying CTEs (WITH x AS (DELETE ...) SELECT ...) parse as a Select
+    return statements[0].find(*_WRITE_EXPRESSIONS) is None
+
+
+# Rules and schema are constant, so they go in the system message and every
+# metadata question shares the same prompt prefix
+SQL_SYSTEM_PROMPT = f"""
+        You are a SQL expert. 
+        Convert the user's question into a SQL query based on the schema below.
+        
+        Rules:
+        - Return ONLY the raw SQL query. No markdown, no explanation.
+        - Use SQLite syntax (or PostgreSQL if that's your DB).
+        - Only SELECT statements allowed.
+        
+        Schema:
+        {SCHEMA_CONTEXT}
+        """
+
+
+def _sql_prompt(question: str) -> str:
+    # Collapse whitespace so trivially different phrasings share a cache entry
+    question = " ".join(question.split())
+    return f"Question: {question}\nSQL:"
+
+
+def generate_sql(question: str) -> str:
+    """
+    Translate a question to SQL. The schema is static, so repeats are
+    answered from llm_service's response cache.
+    """
+    response = llm_service.generate(_sql_prompt(question), system_prompt=SQL_SYSTEM_PROMPT)
+    return response.replace("```sql", "").replace("```", "").strip()
+
+
+def forget_sql(question: str) -> None:
+    """Evict a cached translation that turned out unusable, so the next ask regenerates it."""
+    llm_service.evict(_sql_prompt(question), system_prompt=SQL_SYSTEM_PROMPT)
+
+
+class SQLAgentService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.llm = llm_service
+        self.logger = logging.getLogger("SQLAgentService")
+        self.schema_context = SCHEMA_CONTEXT
+
     def handle(self, question: str) -> str:
         """Generates SQL, executes it, and summarizes the result."""
         
@@ -52,15 +115,29 @@ class SQLAgentService:
 
         # 2. Execute SQL
         try:
-            # Safety: Ensure query is a SELECT
-            if not sql_query.strip().upper().startswith("SELECT"):
+            # Safety: Ensure query is a single read-only statement
+            if not is_read_only_query(sql_query):
+                forget_sql(question)
                 return "I can only perform read operations (SELECT)."
 
-            result_proxy = self.db.execute(text(sql_query))
-            rows = result_proxy.fetchall()
-            
-            # Get column names
-            columns = result_proxy.keys()
+            # Run the generated SQL read-only inside a savepoint. Rolling the
+            # savepoint back restores read-write mode and leaves the request's
+            # transaction usable even if the query fails; the session itself
+            # belongs to the request scope and is not closed here
+            savepoint = self.db.begin_nested()
+            try:
+                self.db.execute(text("SET TRANSACTION READ ONLY"))
+                result_proxy = self.db.execute(text(sql_query))
+                rows = result_proxy.fetchall()
+
+                # Get column names
+                columns = result_proxy.keys()
+            except Exception:
+                # Do not keep replaying SQL the database rejected
+                forget_sql(question)
+                raise
+            finally:
+                savepoint.rollback()
             
             # Convert to list of dicts for the LLM to read easily
             data = [dict(zip(columns, row)) for row in rows]
@@ -71,28 +148,9 @@ class SQLAgentService:
         except Exception as e:
             self.logger.error(f"SQL execution failed: {e}")
             return f"I tried to query the database, but an error occurred: {e}"
-        finally:
-            self.db.close()
 
     def _generate_sql(self, question: str) -> str:
-        prompt = f"""
-        You are a SQL expert. 
-        Convert the user's question into a SQL query based on the schema below.
-        
-        Rules:
-        - Return ONLY the raw SQL query. No markdown, no explanation.
-        - Use SQLite syntax (or PostgreSQL if that's your DB).
-        - Only SELECT statements allowed.
-        
-        Schema:
-        {self.schema_context}
-
-        Question: {question}
-        SQL:
-        """
-        response = self.llm.generate(prompt)
-        clean_sql = response.replace("```sql", "").replace("```", "").strip()
-        return clean_sql
+        return generate_sql(question)
 
     def _summarize_results(self, question: str, data: list) -> str:
         if not data:
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from typing import Dict, Optional, Set
+
+import orjson
+import psycopg2.extensions
+
+from core.logging import logger
+
+from shared.db.repositories.settings import SETTINGS_CHANNEL, invalidate_settings_cache
+from shared.db.session import engine
+
+TASK_EVENTS_CHANNEL = "task_events"
+RECONNECT_DELAY = 5  # seconds
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class TaskEventBroadcaster:
+    """
+    Holds a single LISTEN connection on the task_events channel and fans
+    every notification out to the queues of connected SSE clients.
+
+    The same connection listens on the settings channel so that writes made
+    by any process invalidate this process' settings cache.
+
+    Sync code (threadpool handlers) can wait for a specific task to finish
+    through `register_waiter`, without polling the database.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task_waiters: Dict[str, threading.Event] = {}
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            # Detach so the LISTEN connection does not hold a pool slot forever
+            fairy = engine.raw_connection()
+            fairy.detach()
+            conn = fairy.driver_connection
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {TASK_EVENTS_CHANNEL}")
+                cur.execute(f"LISTEN {SETTINGS_CHANNEL}")
+
+            self._loop.add_reader(conn.fileno(), self._on_readable)
+            self._conn = conn
+            logger.info(f"Listening for Postgres notifications on '{TASK_EVENTS_CHANNEL}'.")
+        except Exception as e:
+            logger.error(f"Failed to start task event listener: {e}")
+            self._schedule_reconnect()
+
+    def stop(self) -> None:
+        if self._conn is None:
+            return
+
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+            self._conn.close()
+        except Exception:
+            pass
+        finally:
+            self._conn = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def register_waiter(self, task_id) -> threading.Event:
+        """Return an event that is set when `task_id` completes or fails."""
+        event = threading.Event()
+        self._task_waiters[str(task_id)] = event
+        return event
+
+    def unregister_waiter(self, task_id) -> None:
+        self._task_waiters.pop(str(task_id), None)
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception as e:
+            logger.error(f"Task event listener connection lost: {e}")
+            self.stop()
+            self._schedule_reconnect()
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            if notify.channel == SETTINGS_CHANNEL:
+                invalidate_settings_cache()
+                continue
+
+            try:
+                task = orjson.loads(notify.payload)
+            except orjson.JSONDecodeError:
+                continue
+
+            waiter = self._task_waiters.get(str(task.get("id")))
+            if waiter is not None:
+                waiter.set()
+
+            for queue in self._subscribers:
+                try:
+                    queue.put_nowait(task)
+                except asyncio.QueueFull:
+                    # Slow client: drop the event rather than block everyone else
+                    pass
+
+    def _schedule_reconnect(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_later(RECONNECT_DELAY, self.start)
+
+
+task_event_broadcaster = TaskEventBroadcaster()
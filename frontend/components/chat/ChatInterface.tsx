@@ -115,7 +115,7 @@ export function ChatInterface() {
            // Update sources - they will be collapsed by default
            setMessages((prev) => prev.map(msg => 
              msg.id === assistantMessageId 
-               ? { ...msg, sources: JSON.stringify(data) } 
+               ? { ...msg, sources: data } 
                : msg
            ));
         } 
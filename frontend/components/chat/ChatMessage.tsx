@@ -1,7 +1,7 @@
 'use client';
 
 import { useState } from 'react';
-import type { ChatMessageResponse, ChatSource } from '@/types';
+import type { ChatMessageResponse } from '@/types';
 import { cn } from '@/lib/utils';
 import { User, Bot, ChevronDown, ChevronUp } from 'lucide-react';
 import { SourceCard } from './SourceCard';
@@ -13,23 +13,9 @@ interface ChatMessageProps {
   defaultSourcesCollapsed?: boolean;
 }
 
-function parseMessageSources(sources: string | null | undefined): ChatSource[] {
-  if (!sources) return [];
-  
-  try {
-    const parsed = JSON.parse(sources);
-    if (Array.isArray(parsed)) {
-      return parsed as ChatSource[];
-    }
-    return [];
-  } catch {
-    return [];
-  }
-}
-
 export function ChatMessage({ message, defaultSourcesCollapsed = true }: ChatMessageProps) {
   const isUser = message.role === 'user';
-  const sources = parseMessageSources(message.sources);
+  const sources = message.sources ?? [];
   const [showSources, setShowSources] = useState(!defaultSourcesCollapsed);
 
   return (
@@ -5,6 +5,7 @@ export interface PaginatedResponse<T> {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;
 }
 
 // Channel Types
@@ -63,7 +64,7 @@ export interface ChatMessageResponse {
   role: string;
   content: string;
   created_at: string;
-  sources?: string | null;
+  sources?: ChatSource[] | null;
 }
 
 export interface ChatSessionDetail extends ChatSessionResponse {
@@ -0,0 +1,140 @@
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+
+from core.logging import logger
+
+from shared.db.session import Base, engine
+from shared.db.models import EMBEDDING_DIM  # also registers the tables on Base.metadata
+
+# Arbitrary key shared by every process that runs startup DDL
+SCHEMA_LOCK_KEY = 7300425001
+# Separate key for the concurrent index builds, which run outside a transaction
+INDEX_BUILD_LOCK_KEY = 7300425002
+
+# An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index behind,
+# which checkfirst would take as already built
+INVALID_INDEXES_SQL = text(
+    """
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE NOT i.indisvalid
+      AND c.relname = ANY(CAST(:names AS text[]))
+    """
+)
+
+# Indexes replaced by newer declarations; dropped so writes stop maintaining them
+SUPERSEDED_INDEXES = (
+    # embedding IS NULL only, replaced by ix_chunks_pending_embeddings
+    "ix_chunks_pending_embedding",
+)
+
+# Expression indexes for the opt-in bit-quantized retrieval mode
+# (rag_binary_candidates > 0). They are not declared on the model, so chunk
+# writes only pay for their HNSW upkeep while the mode is enabled
+BINARY_QUANTIZED_INDEXES = {
+    "ix_chunks_embedding_bit_hnsw": "embedding",
+    "ix_chunks_summary_embedding_bit_hnsw": "summary_embedding",
+}
+CREATE_BINARY_QUANTIZED_INDEX_SQL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON chunks "
+    "USING hnsw ((binary_quantize({column})::bit({dim})) bit_hamming_ops)"
+)
+
+
+def acquire_schema_lock(conn) -> None:
+    """
+    Serialize startup DDL across processes (uvicorn workers, the worker).
+    The lock is released when the surrounding transaction ends.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def create_schema(binary_quantized_indexes: Optional[bool] = None):
+    """
+    Create the extension, tables and indexes.
+    `binary_quantized_indexes` builds (True) or drops (False) the opt-in
+    bit-quantized indexes; None leaves them as they are.
+    """
+    with engine.begin() as con:
+        acquire_schema_lock(con)
+        con.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+
+        # New tables get their indexes here; the tables are empty, so it is cheap
+        Base.metadata.create_all(bind=con)
+
+    # create_all skips tables that already exist, so newer indexes are added
+    # in the background without holding up startup
+    threading.Thread(
+        target=create_missing_indexes,
+        args=(binary_quantized_indexes,),
+        name="index-builder",
+        daemon=True,
+    ).start()
+
+
+def _create_index_concurrently(con, index) -> None:
+    options = index.dialect_options["postgresql"]
+    options["concurrently"] = True
+    try:
+        index.create(bind=con, checkfirst=True)
+    finally:
+        options["concurrently"] = False
+
+
+def create_missing_indexes(binary_quantized_indexes: Optional[bool] = None) -> None:
+    """
+    Build declared indexes that are missing on existing tables with
+    CREATE INDEX CONCURRENTLY, so writes keep going while an index builds
+    on a populated table.
+
+    CONCURRENTLY cannot run inside a transaction block, hence the autocommit
+    connection. Only the process that gets the lock builds; the others skip
+    instead of waiting, since a session blocked on the lock would hold a
+    snapshot that the build itself has to wait for.
+    """
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as con:
+            if not con.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": INDEX_BUILD_LOCK_KEY}):
+                return
+
+            try:
+                indexes = [
+                    index
+                    for table in Base.metadata.sorted_tables
+                    for index in table.indexes
+                ]
+
+                names = [index.name for index in indexes]
+                if binary_quantized_indexes:
+                    names.extend(BINARY_QUANTIZED_INDEXES)
+
+                invalid = con.scalars(INVALID_INDEXES_SQL, {"names": names}).all()
+                for name in invalid:
+                    logger.warning(f"Rebuilding invalid index {name}")
+                    con.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+                for name in SUPERSEDED_INDEXES:
+                    con.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+                for index in indexes:
+                    _create_index_concurrently(con, index)
+
+                if binary_quantized_indexes is not None:
+                    _sync_binary_quantized_indexes(con, binary_quantized_indexes)
+            finally:
+                con.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INDEX_BUILD_LOCK_KEY})
+    except Exception as e:
+        logger.error(f"Failed to create missing indexes: {e}")
+
+
+def _sync_binary_quantized_indexes(con, enabled: bool) -> None:
+    for name, column in BINARY_QUANTIZED_INDEXES.items():
+        if enabled:
+            con.execute(text(CREATE_BINARY_QUANTIZED_INDEX_SQL.format(
+                name=name, column=column, dim=EMBEDDING_DIM,
+            )))
+        else:
+            con.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
@@ -3,8 +3,10 @@ import uuid
 from enum import Enum as PyEnum
 from typing import Optional, List
 
+import sqlalchemy as sa
 from sqlalchemy import (
     JSON,
+    Index,
     String,
     Text,
     Boolean,
@@ -17,15 +19,14 @@ from sqlalchemy import (
     Enum,
     text,
 )
-from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
 
-from shared.db.session import Base, engine
+from shared.db.session import Base
 
-with engine.connect() as con:
-    con.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-    con.commit()
+# Output size of the embedding models; also the bit width of their binary quantization
+EMBEDDING_DIM = 384
 
 class TaskStatus(str, PyEnum):
     PENDING   = "pending"
@@ -99,6 +100,12 @@ class PipelineTask(Base):
         DateTime(timezone=True)
     )
 
+    __table_args__ = (
+        # Serve the task list keyset order (created_at, id), scanned backwards
+        Index("ix_pipeline_tasks_status_created_at", "status", "created_at", "id"),
+        Index("ix_pipeline_tasks_created_at", "created_at", "id"),
+    )
+
 class Channel(Base):
     __tablename__ = "channels"
 
@@ -164,6 +171,17 @@ class Video(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Partial indexes matching the worker and stats predicates
+        Index("ix_videos_downloaded", "video_id", postgresql_where=text("downloaded")),
+        Index("ix_videos_transcribed", "video_id", postgresql_where=text("transcribed")),
+        Index(
+            "ix_videos_pending_transcription",
+            "video_id",
+            postgresql_where=text("downloaded AND NOT transcribed"),
+        ),
+    )
+
 
 class Segment(Base):
     __tablename__ = "segments"
@@ -173,6 +191,7 @@ class Segment(Base):
     video_id: Mapped[str] = mapped_column(
         ForeignKey("videos.video_id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     start_time: Mapped[float] = mapped_column(nullable=False)
@@ -190,6 +209,7 @@ class Chunk(Base):
     video_id: Mapped[str] = mapped_column(
         ForeignKey("videos.video_id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     # Level 1: Timestamps and Order
@@ -204,10 +224,10 @@ class Chunk(Base):
     summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # Main content embedding
-    embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(384))
+    embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(EMBEDDING_DIM))
     
     # Level 2: Distinct Index (Summary Embedding)
-    summary_embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(384))
+    summary_embedding: Mapped[Optional[list[float]]] = mapped_column(Vector(EMBEDDING_DIM))
 
     search_vector: Mapped[str] = mapped_column(
         TSVECTOR,
@@ -223,6 +243,44 @@ class Chunk(Base):
     
     video: Mapped["Video"] = relationship(back_populates="chunks")
 
+    __table_args__ = (
+        # Partial indexes: embedded chunks for stats, pending ones for the embed flow.
+        # The `text` column above shadows sqlalchemy.text in this class body, so
+        # SQL fragments here go through sa.text
+        Index("ix_chunks_embedded", "id", postgresql_where=sa.text("embedding IS NOT NULL")),
+        Index(
+            "ix_chunks_pending_embeddings",
+            "id",
+            postgresql_where=sa.text(
+                "embedding IS NULL OR (summary IS NOT NULL AND summary_embedding IS NULL)"
+            ),
+        ),
+        # ANN indexes for the hybrid search (<#> is negative inner product). Searches are
+        # always filtered by video_id, which relies on hnsw.iterative_scan
+        # (set per connection in shared.db.session) to keep recall
+        Index(
+            "ix_chunks_embedding_ip_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_ip_ops"},
+        ),
+        Index(
+            "ix_chunks_summary_embedding_ip_hnsw",
+            "summary_embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"summary_embedding": "vector_ip_ops"},
+        ),
+        # The bit-quantized indexes of the two-stage retrieval mode are opt-in,
+        # see BINARY_QUANTIZED_INDEXES in shared.db.init.schema
+        # Ordered per-video summaries for the global-summary window query
+        Index(
+            "ix_chunks_video_summaries",
+            "video_id",
+            "chunk_index",
+            postgresql_where=sa.text("summary IS NOT NULL"),
+        ),
+    )
+
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
@@ -243,6 +301,13 @@ class ChatSession(Base):
         nullable=True,
     )
 
+    # Maintained by the chat_message_count_trigger on chat_messages
+    message_count: Mapped[int] = mapped_column(
+        default=0,
+        server_default=text("0"),
+        nullable=False,
+    )
+
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -272,7 +337,7 @@ class ChatMessage(Base):
 
     role: Mapped[str] = mapped_column(Text, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    sources: Mapped[str] = mapped_column(Text, nullable=True)
+    sources: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
@@ -369,5 +434,3 @@ class Settings(Base):
         if self.value_type == SettingValueType.BOOL:
             return self.value.lower() == "true"
         return self.value
-
-Base.metadata.create_all(bind=engine)
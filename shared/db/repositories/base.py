@@ -1,6 +1,6 @@
 from typing import Generic, TypeVar, Optional, List, Type, Any
 
-from sqlalchemy import select, func
+from sqlalchemy import delete, func, inspect, select
 from sqlalchemy.orm import Session
 
 from shared.db.session import Base
@@ -45,9 +45,10 @@ class BaseRepository(Generic[ModelType]):
         return db_obj
 
     def delete(self, id: Any) -> bool:
-        obj = self.get(id)
-        if obj:
-            self.db.delete(obj)
-            self.db.commit()
-            return True
-        return False
+        # Single DELETE ... RETURNING; child rows go through ON DELETE CASCADE
+        pk = inspect(self.model).primary_key[0]
+        deleted = self.db.scalar(
+            delete(self.model).where(pk == id).returning(pk)
+        )
+        self.db.commit()
+        return deleted is not None
@@ -1,10 +1,43 @@
+import time
 from typing import Any, Optional
-from sqlalchemy import select
+from sqlalchemy import case, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from shared.db.models import Settings
+from shared.db.models import Settings, SettingValueType
 from shared.db.repositories.base import BaseRepository
 
+SETTINGS_CHANNEL = "settings_changed"
+
+# Upper bound on staleness for processes that do not LISTEN on SETTINGS_CHANNEL
+SETTINGS_CACHE_TTL = 60  # seconds
+
+# (component, section) -> (expires_at, settings)
+_settings_cache: dict[tuple[str, Optional[str]], tuple[float, dict]] = {}
+
+
+def _cast_bool(value: str) -> bool:
+    # Case-insensitive: rows written before bool values were normalized, or
+    # edited by hand, may hold "True" or "TRUE"
+    return value.lower() == "true"
+
+_CASTERS = {
+    SettingValueType.INT: int,
+    SettingValueType.FLOAT: float,
+    SettingValueType.BOOL: _cast_bool,
+    SettingValueType.STRING: str,
+}
+
+
+def _serialize_value(value: Any, value_type: str) -> str:
+    if SettingValueType(value_type) == SettingValueType.BOOL:
+        return str(value).lower()
+    return str(value)
+
+
+def invalidate_settings_cache() -> None:
+    _settings_cache.clear()
+
 
 class SettingsRepository(BaseRepository[Settings]):
     def __init__(self, db: Session):
@@ -15,6 +48,11 @@ class SettingsRepository(BaseRepository[Settings]):
         return SettingsRepository(db).get_settings(component, section)
         
     def get_settings(self, component: str, section: Optional[str] = None) -> dict:
+        cache_key = (component, section)
+        cached = _settings_cache.get(cache_key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return dict(cached[1])
+
         stmt = (
             select(Settings.key, Settings.value, Settings.value_type)
             .where(
@@ -27,15 +65,12 @@ class SettingsRepository(BaseRepository[Settings]):
 
         rows = self.db.execute(stmt).all()
 
-        def cast(v: str, t: str):
-            return {
-                "int": int,
-                "float": float,
-                "bool": lambda x: x.lower() == "true",
-                "string": str,
-            }[t](v)
-
-        return {key: cast(value, value_type) for key, value, value_type in rows}
+        result = {
+            key: _CASTERS[SettingValueType(value_type)](value)
+            for key, value, value_type in rows
+        }
+        _settings_cache[cache_key] = (time.monotonic() + SETTINGS_CACHE_TTL, result)
+        return dict(result)
 
     def add_setting(
         self,
@@ -47,28 +82,25 @@ class SettingsRepository(BaseRepository[Settings]):
         value_type: str,
         description: Optional[str] = None,
     ) -> Settings:
-        # Check if exists
-        stmt = select(Settings).where(
-            Settings.component == component,
-            Settings.section == section,
-            Settings.key == key,
+        # The unique constraint decides "already exists": one round trip, no race
+        stmt = (
+            pg_insert(Settings)
+            .values(
+                component=component,
+                section=section,
+                key=key,
+                value=_serialize_value(value, value_type),
+                value_type=value_type,
+                description=description,
+            )
+            .on_conflict_do_nothing(constraint="uq_settings_component_section_key")
+            .returning(Settings)
         )
-        existing = self.db.scalar(stmt)
-        if existing:
+        setting = self.db.scalar(stmt)
+        if setting is None:
             raise ValueError("Setting already exists")
 
-        setting = Settings(
-            component=component,
-            section=section,
-            key=key,
-            value=str(value),
-            value_type=value_type,
-            description=description,
-        )
-
-        self.db.add(setting)
-        self.db.commit()
-        self.db.refresh(setting)
+        self._commit_detached(setting, component)
         return setting
 
     def update_setting(
@@ -81,27 +113,40 @@ class SettingsRepository(BaseRepository[Settings]):
         value_type: Optional[str] = None,
         description: Optional[str] = None,
     ) -> Settings:
-        stmt = select(Settings).where(
+        where = (
             Settings.component == component,
             Settings.section == section,
             Settings.key == key,
         )
-        setting = self.db.scalar(stmt)
 
-        if not setting:
-            raise ValueError("Setting not found")
+        changes = {}
+        if value_type is not None:
+            changes["value_type"] = value_type
 
         if value is not None:
-            setting.value = str(value)
-
-        if value_type is not None:
-            setting.value_type = value_type
+            if value_type is not None:
+                changes["value"] = _serialize_value(value, value_type)
+            else:
+                # Stored type is only known to the row itself
+                changes["value"] = case(
+                    (Settings.value_type == SettingValueType.BOOL, func.lower(str(value))),
+                    else_=str(value),
+                )
 
         if description is not None:
-            setting.description = description
+            changes["description"] = description
 
-        self.db.commit()
-        self.db.refresh(setting)
+        if changes:
+            stmt = update(Settings).where(*where).values(**changes).returning(Settings)
+        else:
+            stmt = select(Settings).where(*where)
+
+        setting = self.db.scalar(stmt)
+
+        if not setting:
+            raise ValueError("Setting not found")
+
+        self._commit_detached(setting, component)
         return setting
 
     def delete_setting(
@@ -122,6 +167,31 @@ class SettingsRepository(BaseRepository[Settings]):
             return False
 
         self.db.delete(setting)
-        self.db.commit()
+        self._commit_changed(component)
         return True
 
+    def _commit_detached(self, setting: Settings, component: str) -> None:
+        """
+        Commit a write whose row was already loaded by RETURNING.
+        Detaching first keeps its attributes from expiring on commit, which
+        would otherwise cost a SELECT when the caller reads them.
+        """
+        self.db.expunge(setting)
+        self._commit_changed(component)
+
+    def _commit_changed(self, component: str) -> None:
+        """
+        Commit a settings write and invalidate caches.
+
+        The NOTIFY is queued in the same transaction, so other processes only
+        hear about it once the write is visible. The local cache is cleared
+        after the commit, so a read racing the write cannot leave stale
+        values behind.
+        """
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :component)"),
+            {"channel": SETTINGS_CHANNEL, "component": component},
+        )
+        self.db.commit()
+        invalidate_settings_cache()
+
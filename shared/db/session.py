@@ -10,7 +10,16 @@ engine = create_engine(
     settings.database_url,
     pool_size=settings.db_pool_size,
     max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    query_cache_size=settings.db_query_cache_size,
     echo=settings.debug,
+    # pgvector >= 0.8: keep scanning the HNSW graph until enough rows pass the
+    # video_id filter, instead of filtering a fixed ef_search candidate set.
+    # Sent in the startup packet, so it costs no round-trip; older pgvector
+    # versions just ignore the placeholder
+    connect_args={"options": "-c hnsw.iterative_scan=strict_order"},
 )
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
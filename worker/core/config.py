@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     database_url: str
     db_pool_size: int = 5
     db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_query_cache_size: int = 1200
 
     # OpenAI
     openai_api_key: str
@@ -25,19 +29,29 @@ class Settings(BaseSettings):
     # Whisper
     whisper_model_size: str = "large-v3"
     whisper_device: Optional[str] = "cuda"
-    whisper_compute_type: Optional[str] = "float16"
+    whisper_compute_type: Optional[str] = None  # unset: CTranslate2 picks the fastest supported type
+    whisper_quantization: Optional[str] = None  # e.g. "int8_float16": convert once, load from disk
+    whisper_num_workers: int = 1  # concurrent transcriptions sharing one set of weights
+    whisper_cpu_threads: int = 0  # 0 = CTranslate2 default
+    whisper_batch_size: int = 8  # VAD segments per forward pass; <= 1 transcribes sequentially
 
     # Embedding
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_batch_size: int = 32
+    embedding_fp16: bool = True  # half-precision inference when running on CUDA
 
     # Chunking
     target_tokens: int = 512
     overlap_tokens: int = 100
     avg_chars_per_token: int = 4
+    summary_concurrency: int = 8  # parallel LLM calls for chunk summaries
+
+    # Ingest
+    download_concurrency: int = 4  # parallel yt-dlp | ffmpeg pipelines
 
     # Paths
     audio_dir: str = str(BASE_DIR / "data" / "audio")
+    model_cache_dir: str = str(BASE_DIR / "data" / "models")
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,141 +1,182 @@
 import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import attrgetter
 import sqlalchemy as sa
 import logging
+from sqlalchemy.orm import Session
 
 from typing import Optional
 
+from core.config import settings as app_settings
 from shared.services.llm import llm_service
 from shared.db.session import get_db_context
-from shared.db.models import Video, Segment
+from shared.db.models import Chunk, Video, Segment
 
 logger = logging.getLogger(__name__) 
 logger.setLevel(logging.INFO)
 
+# Videos whose segments and built chunks are held in memory at once
+CHUNK_FLOW_BATCH_SIZE = 20
+
 def estimate_tokens(text_len: int, avg_chars_per_token: int) -> int:
     return math.ceil(text_len / avg_chars_per_token)
 
-def get_transcribed_videos() -> list[str]:
-    """Get video IDs that have been transcribed."""
+def get_transcribed_videos(video_ids: Optional[list[str]] = None) -> list[str]:
+    """Get video IDs that have been transcribed, optionally restricted to `video_ids`."""
     with get_db_context() as db:
-        videos = db.query(Video).filter(Video.transcribed.is_(True)).all()
-        video_ids = [v.video_id for v in videos]
-        logger.info(f"Found {len(video_ids)} transcribed videos")
-        return video_ids
+        stmt = sa.select(Video.video_id).where(Video.transcribed.is_(True))
+        if video_ids:
+            stmt = stmt.where(Video.video_id.in_(video_ids))
 
-def chunk_video(video_id: str, settings: dict) -> dict:
-    """Create chunks for a single video."""
-    logger.info(f"Chunking video: {video_id}")
+        transcribed_ids = list(db.scalars(stmt))
+        logger.info(f"Found {len(transcribed_ids)} transcribed videos")
+        return transcribed_ids
 
+def get_segments_by_video(video_ids: list[str]) -> dict[str, list]:
+    """Load the segments of every video in one ordered query, grouped by video."""
     with get_db_context() as db:
-        # Get segments
-        segments = (
-            db.query(Segment)
-            .filter(Segment.video_id == video_id)
-            .order_by(Segment.start_time)
-            .all()
-        )
-
-        if not segments:
-            logger.warning(f"No segments found for: {video_id}")
-            return {"video_id": video_id, "chunks": 0}
-
-        # Build chunks
-        chunks = []
-        current_segments = []
-        current_char_len = 0
-
-        for seg in segments:
-            text = seg.text.strip()
-            if not text:
-                continue
+        rows = db.execute(
+            sa.select(Segment.video_id, Segment.start_time, Segment.end_time, Segment.text)
+            .where(Segment.video_id.in_(video_ids))
+            .order_by(Segment.video_id, Segment.start_time)
+        ).all()
+
+    return {
+        video_id: list(group)
+        for video_id, group in groupby(rows, key=attrgetter("video_id"))
+    }
 
-            current_segments.append({
-                "start_time": seg.start_time,
-                "end_time": seg.end_time,
-                "text": text,
-            })
-            current_char_len += len(text) + 1
-
-            if estimate_tokens(current_char_len, settings["avg_chars_per_token"]) >= settings["target_tokens"]:
-                # Create chunk
-                chunk_text = " ".join(s["text"] for s in current_segments)
-                prompt = f"Summarize the following transcript segment in one concise sentence:\n\n{chunk_text}"
-                summary = llm_service.generate(
-                    prompt,
-                    temperature=settings["llm_temperature"],
-                ).strip()
-
-                chunks.append({
-                    "start_time": current_segments[0]["start_time"],
-                    "end_time": current_segments[-1]["end_time"],
-                    "text": chunk_text,
-                    "summary": summary,
-                })
-
-                # Handle overlap
-                overlap_char_limit = settings["overlap_tokens"] * settings["avg_chars_per_token"]
-                while current_char_len > overlap_char_limit and len(current_segments) > 1:
-                    removed = current_segments.pop(0)
-                    current_char_len -= len(removed["text"]) + 1
-
-        # Final chunk
-        if current_segments and estimate_tokens(current_char_len, settings["avg_chars_per_token"]) > 50:
-            chunk_text = " ".join(s["text"] for s in current_segments)
-            prompt = f"Summarize the following transcript segment in one concise sentence:\n\n{chunk_text}"
-            summary = llm_service.generate(prompt).strip()
+def build_chunks(segments: list, settings: dict) -> list[dict]:
+    """
+    Build summarized chunks for one video from its segments (ordered by start_time).
+    Touches no database, so a batch of videos can be written at once.
+    """
+    # Build chunks over a sliding window of segments
+    chunks = []
+    current_segments = deque()
+    current_char_len = 0
+
+    for seg in segments:
+        text = seg.text.strip()
+        if not text:
+            continue
+
+        # Cache the length once; the overlap trim below reuses it
+        text_len = len(text) + 1
+        current_segments.append({
+            "start_time": seg.start_time,
+            "end_time": seg.end_time,
+            "text": text,
+            "len": text_len,
+        })
+        current_char_len += text_len
+
+        if estimate_tokens(current_char_len, settings["avg_chars_per_token"]) >= settings["target_tokens"]:
+            # Create chunk; summaries are generated afterwards, concurrently
             chunks.append({
                 "start_time": current_segments[0]["start_time"],
                 "end_time": current_segments[-1]["end_time"],
-                "text": chunk_text,
-                "summary": summary,
+                "text": " ".join(s["text"] for s in current_segments),
             })
 
-        # Delete existing chunks and insert new ones
-        db.execute(
-            sa.text("DELETE FROM chunks WHERE video_id = :vid"),
-            {"vid": video_id},
-        )
-
-        for index, ch in enumerate(chunks):
-            db.execute(
-                sa.text("""
-                    INSERT INTO chunks (video_id, chunk_index, start_time, end_time, text, summary)
-                    VALUES (:vid, :idx, :start, :end, :text, :summary)
-                """),
-                {
-                    "vid": video_id,
-                    "idx": index,
-                    "start": ch["start_time"],
-                    "end": ch["end_time"],
-                    "text": ch["text"],
-                    "summary": ch["summary"],
-                },
-            )
+            # Handle overlap
+            overlap_char_limit = settings["overlap_tokens"] * settings["avg_chars_per_token"]
+            while current_char_len > overlap_char_limit and len(current_segments) > 1:
+                removed = current_segments.popleft()
+                current_char_len -= removed["len"]
+
+    # Final chunk
+    if current_segments and estimate_tokens(current_char_len, settings["avg_chars_per_token"]) > 50:
+        chunks.append({
+            "start_time": current_segments[0]["start_time"],
+            "end_time": current_segments[-1]["end_time"],
+            "text": " ".join(s["text"] for s in current_segments),
+        })
+
+    # Summaries are independent network calls, so overlap them
+    if chunks:
+        def summarize(chunk_text: str) -> str:
+            prompt = f"Summarize the following transcript segment in one concise sentence:\n\n{chunk_text}"
+            return llm_service.generate(
+                prompt,
+                temperature=settings["llm_temperature"],
+            ).strip()
+
+        max_workers = max(1, min(app_settings.summary_concurrency, len(chunks)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            summaries = executor.map(summarize, [ch["text"] for ch in chunks])
+            for ch, summary in zip(chunks, summaries):
+                ch["summary"] = summary
+
+    return chunks
+
+
+def save_chunks(db: Session, chunks_by_video: dict[str, list[dict]]) -> None:
+    """Replace the chunks of every given video with one DELETE and one bulk INSERT."""
+    db.execute(sa.delete(Chunk).where(Chunk.video_id.in_(list(chunks_by_video))))
+
+    rows = [
+        {
+            "video_id": video_id,
+            "chunk_index": index,
+            "start_time": ch["start_time"],
+            "end_time": ch["end_time"],
+            "text": ch["text"],
+            "summary": ch["summary"],
+        }
+        for video_id, chunks in chunks_by_video.items()
+        for index, ch in enumerate(chunks)
+    ]
+    if rows:
+        # One executemany, sent as multi-row INSERTs by insertmanyvalues
+        db.execute(sa.insert(Chunk), rows)
+
+
+def chunk_video(video_id: str, settings: dict, segments: Optional[list] = None) -> dict:
+    """
+    Create chunks for a single video.
+    `segments` may be preloaded (ordered by start_time); otherwise they are queried.
+    """
+    if segments is None:
+        segments = get_segments_by_video([video_id]).get(video_id, [])
+
+    if not segments:
+        logger.warning(f"No segments found for: {video_id}")
+        return {"video_id": video_id, "chunks": 0}
+
+    logger.info(f"Chunking video: {video_id}")
+    chunks = build_chunks(segments, settings)
 
+    with get_db_context() as db:
+        save_chunks(db, {video_id: chunks})
         db.commit()
-        logger.info(f"Created {len(chunks)} chunks for: {video_id}")
 
-        return {"video_id": video_id, "chunks": len(chunks)}
+    logger.info(f"Created {len(chunks)} chunks for: {video_id}")
+    return {"video_id": video_id, "chunks": len(chunks)}
 
 
-def chunk_flow(task_id: str, settings: dict, video_ids: Optional[list[str]] = None) -> dict:
+def chunk_flow(
+    task_id: str,
+    settings: dict,
+    video_ids: Optional[list[str]] = None,
+    batch_size: int = CHUNK_FLOW_BATCH_SIZE,
+) -> dict:
     """
     Main flow for building chunks from transcriptions.
     
     Args:
         video_ids: Optional list of specific video IDs to chunk
+        batch_size: Number of videos loaded, chunked and committed together
     
     Returns:
         Dictionary with chunking results
     """
     logger.info(f"Starting chunking flow for task: {task_id}")
 
-    # Get transcribed videos
-    all_video_ids = get_transcribed_videos()
-
-    # Filter if specific video IDs provided
-    if video_ids:
-        all_video_ids = [vid for vid in all_video_ids if vid in video_ids]
+    # Get transcribed videos (restricted to video_ids, if provided)
+    all_video_ids = get_transcribed_videos(video_ids)
 
     if not all_video_ids:
         logger.info("No videos to chunk")
@@ -144,9 +185,31 @@ def chunk_flow(task_id: str, settings: dict, video_ids: Optional[list[str]] = No
     logger.info(f"Processing {len(all_video_ids)} videos")
 
     total_chunks = 0
-    for video_id in all_video_ids:
-        result = chunk_video(video_id, settings)
-        total_chunks += result["chunks"]
+    for start in range(0, len(all_video_ids), batch_size):
+        batch_ids = all_video_ids[start:start + batch_size]
+
+        # One query for the batch's segments instead of one per video
+        segments_by_video = get_segments_by_video(batch_ids)
+
+        chunks_by_video = {}
+        for video_id in batch_ids:
+            segments = segments_by_video.pop(video_id, None)
+            if not segments:
+                logger.warning(f"No segments found for: {video_id}")
+                continue
+
+            logger.info(f"Chunking video: {video_id}")
+            chunks_by_video[video_id] = build_chunks(segments, settings)
+            logger.info(f"Built {len(chunks_by_video[video_id])} chunks for: {video_id}")
+
+        # The batch's chunks are replaced in one transaction, so finished
+        # batches are kept if a later one fails
+        if chunks_by_video:
+            with get_db_context() as db:
+                save_chunks(db, chunks_by_video)
+                db.commit()
+
+        total_chunks += sum(len(chunks) for chunks in chunks_by_video.values())
 
     result = {
         "videos_processed": len(all_video_ids),
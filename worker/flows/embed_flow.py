@@ -1,87 +1,132 @@
 import logging
+from functools import lru_cache
 from typing import Optional, List # Added typing imports
 
+import numpy as np
+import sqlalchemy as sa
+
+from core.config import settings
 from shared.db.session import get_db_context
 from shared.db.models import Chunk
 
-
-# Lazy load the model
-_embedding_model = None
+# Models are loaded lazily; keep the current one and the previous one after a
+# settings change without holding every model ever used
+EMBEDDING_MODEL_CACHE_SIZE = 2
 
 logger = logging.getLogger(__name__) 
 logger.setLevel(logging.INFO)
 
+@lru_cache(maxsize=EMBEDDING_MODEL_CACHE_SIZE)
 def get_embedding_model(embedding_model: str):
-    """Get or create embedding model (singleton pattern)."""
-    global _embedding_model
-    
-    if _embedding_model is None:
-        import torch
-        from sentence_transformers import SentenceTransformer
-        
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        _embedding_model = SentenceTransformer(
-            embedding_model,
-            device=device,
-        )
-    
-    return _embedding_model
-
-
-def count_pending_embeddings(video_ids: Optional[List[str]] = None) -> int:
-    """
-    Count chunks that need embeddings. 
-    If video_ids is provided, only counts chunks belonging to those videos.
-    """
-    with get_db_context() as db:
-        query = db.query(Chunk).filter(Chunk.embedding.is_(None))
+    """Get or create the embedding model for `embedding_model` (one instance per name)."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(
+        embedding_model,
+        device=device,
+    )
 
-        if video_ids:
-            query = query.filter(Chunk.video_id.in_(video_ids))
+    if device == "cuda" and settings.embedding_fp16:
+        # Half the memory traffic and tensor-core rate; vectors are stored as
+        # float32 by pgvector either way
+        model = model.half()
 
-        count = query.count()
-        
-        filter_msg = f" (filtered by {len(video_ids)} videos)" if video_ids else ""
-        logger.info(f"Found {count} chunks pending embedding{filter_msg}")
-        return count
+    return model
 
 
-def embed_batch(embedding_model: str, batch_size: int = 32, video_ids: Optional[List[str]] = None) -> dict:
+def embed_batch(
+    embedding_model: str,
+    batch_size: int = 32,
+    video_ids: Optional[List[str]] = None,
+    after_id: int = 0,
+    with_total: bool = False,
+) -> dict:
+    """
+    Embed the next `batch_size` pending chunks with id > `after_id`.
+    With `with_total`, also report how many chunks are pending in total.
+    """
     with get_db_context() as db:
-        query = db.query(Chunk).filter(
-            (Chunk.embedding.is_(None)) | (Chunk.summary_embedding.is_(None))
+        # Keyset on id, plain Core rows: no ORM entities in the hot loop
+        columns = [Chunk.id, Chunk.text, Chunk.summary]
+        if with_total:
+            # Evaluated before LIMIT, so it counts every pending row
+            columns.append(sa.func.count().over().label("total"))
+
+        stmt = sa.select(*columns).where(
+            # Same predicate as ix_chunks_pending_embeddings. Chunks without a
+            # summary never get a summary embedding, so they are not pending
+            (Chunk.embedding.is_(None))
+            | (Chunk.summary.isnot(None) & Chunk.summary_embedding.is_(None)),
+            Chunk.id > after_id,
         )
 
         if video_ids:
-            query = query.filter(Chunk.video_id.in_(video_ids))
+            stmt = stmt.where(Chunk.video_id.in_(video_ids))
 
-        batch = query.limit(batch_size).all()
+        batch = db.execute(stmt.order_by(Chunk.id).limit(batch_size)).all()
 
         if not batch:
-            return {"processed": 0, "success": True}
+            return {"processed": 0, "success": True, "last_id": after_id, "total": 0}
+
+        total = batch[0].total if with_total else None
 
+        # Texts and the non-empty summaries go through one encode call; empty
+        # summaries are not encoded at all
         texts = [c.text for c in batch]
-        summaries = [c.summary if c.summary else "" for c in batch]
+        summaries = [c.summary for c in batch if c.summary]
 
         try:
             model = get_embedding_model(embedding_model)
-            text_embeddings = model.encode(texts, normalize_embeddings=True, batch_size=batch_size)
-            
-            summary_embeddings = model.encode(summaries, normalize_embeddings=True, batch_size=batch_size)
-
-            for i, chunk_obj in enumerate(batch):
-                chunk_obj.embedding = text_embeddings[i].tolist()
-                
-                if chunk_obj.summary:
-                    chunk_obj.summary_embedding = summary_embeddings[i].tolist()
+            embeddings = model.encode(
+                texts + summaries,
+                normalize_embeddings=True,
+                batch_size=batch_size * 2,
+            )
+            text_embeddings = embeddings[:len(texts)]
+            summary_embeddings = iter(embeddings[len(texts):])
+
+            # Single UPDATE ... FROM (VALUES ...) for the whole batch
+            vector_type = Chunk.embedding.type
+            data = sa.values(
+                sa.column("id", sa.Integer),
+                sa.column("embedding", vector_type),
+                sa.column("summary_embedding", vector_type),
+                name="data",
+            ).data([
+                (
+                    chunk.id,
+                    text_embeddings[i].tolist(),
+                    next(summary_embeddings).tolist() if chunk.summary else None,
+                )
+                for i, chunk in enumerate(batch)
+            ])
+
+            db.execute(
+                sa.update(Chunk)
+                .where(Chunk.id == data.c.id)
+                .values(
+                    embedding=sa.cast(data.c.embedding, vector_type),
+                    summary_embedding=sa.func.coalesce(
+                        sa.cast(data.c.summary_embedding, vector_type),
+                        Chunk.summary_embedding,
+                    ),
+                )
+            )
 
             db.commit()
-            return {"processed": len(batch), "success": True}
+            return {
+                "processed": len(batch),
+                "success": True,
+                "last_id": batch[-1].id,
+                "total": total,
+            }
 
         except Exception as e:
             logger.error(f"Embedding batch failed: {e}")
             db.rollback()
-            return {"processed": 0, "success": False, "error": str(e)}
+            return {"processed": 0, "success": False, "error": str(e), "total": total}
 
 def embed_flow(task_id: str, embedding_model: str, video_ids: Optional[List[str]] = None, batch_size: int = 32) -> dict:
     """
@@ -96,17 +141,28 @@ def embed_flow(task_id: str, embedding_model: str, video_ids: Optional[List[str]
         Dictionary with embedding results
     """
     logger.info(f"[{task_id}] Starting embedding flow")
-    total_pending = count_pending_embeddings(video_ids=video_ids)
-
-    if total_pending == 0:
-        logger.info(f"[{task_id}] No chunks to embed")
-        return {"embedded": 0, "failed": 0}
 
     embedded = 0
     failed = 0
+    last_id = 0
+    total_pending = None
 
     while True:
-        result = embed_batch(embedding_model=embedding_model, batch_size=batch_size, video_ids=video_ids)
+        result = embed_batch(
+            embedding_model=embedding_model,
+            batch_size=batch_size,
+            video_ids=video_ids,
+            after_id=last_id,
+            with_total=total_pending is None,
+        )
+
+        if total_pending is None:
+            # The first batch carries the pending count, no separate COUNT(*)
+            total_pending = result["total"] or 0
+            if total_pending == 0 and result.get("success", True):
+                logger.info(f"[{task_id}] No chunks to embed")
+                return {"embedded": 0, "failed": 0}
+            logger.info(f"[{task_id}] Found {total_pending} chunks pending embedding")
 
         if result["processed"] == 0:
             if not result.get("success", True):
@@ -114,6 +170,7 @@ def embed_flow(task_id: str, embedding_model: str, video_ids: Optional[List[str]
             break
 
         embedded += result["processed"]
+        last_id = result["last_id"]
         logger.info(f"[{task_id}] Progress: {embedded}/{total_pending}")
 
         if embedded >= total_pending:
@@ -139,14 +196,30 @@ def embed_question(question: str, embedding_model: str) -> List[float]:
     Returns:
         List of floats representing the vector
     """
+    return embed_questions([question], embedding_model)[0]
+
+
+def embed_questions(questions: List[str], embedding_model: str) -> List[List[float]]:
+    """
+    Generates embeddings for several questions in a single forward pass.
+    
+    Args:
+        questions: The texts to embed
+        
+    Returns:
+        One list of floats per question, in the same order
+    """
     # 1. Get the singleton model instance
     model = get_embedding_model(embedding_model)
     
-    # 2. Generate embedding (returns numpy array)
-    embedding = model.encode(
-        question,
+    # 2. Generate embeddings (returns numpy array)
+    embeddings = model.encode(
+        questions,
         normalize_embeddings=True,
+        batch_size=len(questions),
     )
     
-    # 3. Convert to standard list
-    return embedding.tolist()
+    # 3. Convert to standard lists. The values are float32, so use their
+    # shortest round-trip repr: tolist() would widen them to float64 digits
+    # and roughly double the JSON result and the vector literal sent to pgvector
+    return [[float(str(x)) for x in row] for row in embeddings.astype(np.float32)]
@@ -1,10 +1,17 @@
 import logging
+import signal
 import subprocess
 import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from core.config import settings
 from shared.db.session import get_db_context
 from shared.db.models import Channel, Video
@@ -38,63 +45,84 @@ def fetch_channel_videos(channel_url: str, max_videos: int = 10, timeout_seconds
         channel_url
     ]
 
-    try:
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            check=True,
-            timeout=timeout_seconds * 2, # increased timeout buffer
-        )
-        
-        valid_videos = []
-        for line in result.stdout.splitlines():
-            if len(valid_videos) >= max_videos:
-                break
-
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            # --- SMART FILTERING LOGIC ---
-            video_id = data.get('id')
-            title = data.get('title', 'Unknown')
-            live_status = data.get('live_status') # is_live, is_upcoming, was_live, not_live
-            duration = data.get('duration')
-
-            # 1. Skip Upcoming Videos (Premiere or Scheduled Stream)
-            if live_status == 'is_upcoming':
-                logger.info(f"Skipping upcoming video: {title} ({video_id})")
-                continue
-
-            # 2. Skip Currently Live Streams (Infinite duration/download issues)
-            if live_status == 'is_live':
-                logger.info(f"Skipping currently live video: {title} ({video_id})")
-                continue
-
-            # 3. Skip videos with no duration (usually means they are broken or unprocessed)
-            if duration is None and live_status != 'is_upcoming':
-                # Sometimes 'was_live' videos have None duration immediately after ending
-                logger.info(f"Skipping video with no duration: {title} ({video_id})")
-                continue
-
-            # 4. Optional: Filter out Shorts if your pipeline only wants long-form
-            # Shorts usually have "shorts" in the web_page_url or duration < 60
-            # if duration and duration < 60:
-            #     continue
-
-            valid_videos.append(data)
-        
-        logger.info(f"Fetched {len(valid_videos)} valid VOD/Standard metadata entries")
-        return valid_videos
-
-    except subprocess.TimeoutExpired:
-        logger.error(f"yt-dlp metadata fetch timed out after {timeout_seconds}s")
-        raise 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"yt-dlp failed with exit code {e.returncode}: {e.stderr}")
-        raise
+    # stderr (-v is chatty) goes to a temp file so it can never fill a pipe and
+    # stall the stdout reader
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout_seconds * 2, on_timeout)  # increased timeout buffer
+        timer.start()
+        try:
+            valid_videos = _collect_valid_videos(proc.stdout, max_videos)
+        finally:
+            timer.cancel()
+            # Stop enumerating as soon as enough videos were collected
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            logger.error(f"yt-dlp metadata fetch timed out after {timeout_seconds}s")
+            raise subprocess.TimeoutExpired(cmd, timeout_seconds * 2)
+
+        if proc.returncode not in (0, -signal.SIGTERM) and len(valid_videos) < max_videos:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace")
+            logger.error(f"yt-dlp failed with exit code {proc.returncode}: {stderr}")
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+    logger.info(f"Fetched {len(valid_videos)} valid VOD/Standard metadata entries")
+    return valid_videos
+
+
+def _collect_valid_videos(lines, max_videos: int) -> list[dict]:
+    """Read yt-dlp --dump-json output line by line, keeping playable VODs."""
+    valid_videos = []
+    for line in lines:
+        if len(valid_videos) >= max_videos:
+            break
+
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+        # --- SMART FILTERING LOGIC ---
+        video_id = data.get('id')
+        title = data.get('title', 'Unknown')
+        live_status = data.get('live_status') # is_live, is_upcoming, was_live, not_live
+        duration = data.get('duration')
+
+        # 1. Skip Upcoming Videos (Premiere or Scheduled Stream)
+        if live_status == 'is_upcoming':
+            logger.info(f"Skipping upcoming video: {title} ({video_id})")
+            continue
+
+        # 2. Skip Currently Live Streams (Infinite duration/download issues)
+        if live_status == 'is_live':
+            logger.info(f"Skipping currently live video: {title} ({video_id})")
+            continue
+
+        # 3. Skip videos with no duration (usually means they are broken or unprocessed)
+        if duration is None and live_status != 'is_upcoming':
+            # Sometimes 'was_live' videos have None duration immediately after ending
+            logger.info(f"Skipping video with no duration: {title} ({video_id})")
+            continue
+
+        # 4. Optional: Filter out Shorts if your pipeline only wants long-form
+        # Shorts usually have "shorts" in the web_page_url or duration < 60
+        # if duration and duration < 60:
+        #     continue
+
+        valid_videos.append(data)
+
+    return valid_videos
 
 
 def register_channel(channel_url: str) -> int:
@@ -124,35 +152,42 @@ def register_channel(channel_url: str) -> int:
 
 def register_videos(channel_id: int, videos_data: list[dict]) -> list[str]:
     """Register videos in database, return list of new video IDs."""
-    new_video_ids = []
+    rows = []
+    for video_data in videos_data:
+        published = None
+        if "upload_date" in video_data:
+            try:
+                published = datetime.strptime(video_data["upload_date"], "%Y%m%d")
+            except (ValueError, TypeError):
+                pass
+
+        rows.append(
+            {
+                "video_id": video_data["id"],
+                "channel_id": channel_id,
+                "title": video_data.get("title"),
+                "description": video_data.get("description"),
+                "published_at": published,
+                "duration": video_data.get("duration"),
+                "downloaded": False,
+                "transcribed": False,
+            }
+        )
+
+    if not rows:
+        return []
 
     with get_db_context() as db:
-        for video_data in videos_data:
-            video_id = video_data["id"]
-
-            # Skip if already exists
-            if db.query(Video).filter(Video.video_id == video_id).first():
-                continue
-
-            published = None
-            if "upload_date" in video_data:
-                try:
-                    published = datetime.strptime(video_data["upload_date"], "%Y%m%d")
-                except (ValueError, TypeError):
-                    pass
-
-            db.add(
-                Video(
-                    video_id=video_id,
-                    channel_id=channel_id,
-                    title=video_data.get("title"),
-                    description=video_data.get("description"),
-                    published_at=published,
-                    duration=video_data.get("duration"),
-                )
+        # Existing videos are skipped by the primary key; RETURNING only
+        # yields the rows that were actually inserted
+        new_video_ids = list(
+            db.scalars(
+                pg_insert(Video)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[Video.video_id])
+                .returning(Video.video_id)
             )
-            new_video_ids.append(video_id)
-
+        )
         db.commit()
         logger.info(f"Registered {len(new_video_ids)} new videos")
 
@@ -210,13 +245,22 @@ def download_audio(video_id: str, timeout_seconds: int = DOWNLOAD_TIMEOUT) -> Op
         # Allow p1 to receive a SIGPIPE if p2 exits.
         p1.stdout.close() 
         
-        out, err = p2.communicate(timeout=timeout_seconds)
-
-        if p2.returncode != 0:
-            # Check p1 stderr if p2 failed
+        try:
+            out, err = p2.communicate(timeout=timeout_seconds)
+            # ffmpeg exits 0 on a truncated stream, so yt-dlp's status matters too
+            p1.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            p1.kill()
+            p2.kill()
+            p1.wait()
+            p2.wait()
+            raise
+
+        if p2.returncode != 0 or p1.returncode != 0:
             p1_err = p1.stderr.read().decode() if p1.stderr else ""
             error_msg = err.decode() if err else "Unknown ffmpeg error"
-            raise subprocess.CalledProcessError(p2.returncode, ffmpeg_cmd, output=error_msg, stderr=p1_err)
+            returncode = p2.returncode or p1.returncode
+            raise subprocess.CalledProcessError(returncode, ffmpeg_cmd, output=error_msg, stderr=p1_err)
 
         tmp_output.replace(output)
         logger.info(f"Downloaded and normalized: {video_id}")
@@ -237,13 +281,20 @@ def download_audio(video_id: str, timeout_seconds: int = DOWNLOAD_TIMEOUT) -> Op
 
 def update_video_download_status(video_id: str, audio_path: Optional[str]):
     """Update video download status in database."""
+    if not audio_path:
+        return
+
     with get_db_context() as db:
-        video = db.query(Video).filter(Video.video_id == video_id).first()
-        if video and audio_path:
-            video.audio_path = audio_path
-            video.downloaded = True
-            db.commit()
-            logger.info(f"Updated download status for: {video_id}")
+        # Update in place; loading the row first would cost an extra round-trip
+        updated = db.execute(
+            sa.update(Video)
+            .where(Video.video_id == video_id)
+            .values(audio_path=audio_path, downloaded=True)
+        ).rowcount
+        db.commit()
+
+    if updated:
+        logger.info(f"Updated download status for: {video_id}")
 
 
 def ingest_channel_flow(
@@ -271,14 +322,23 @@ def ingest_channel_flow(
     if download and new_video_ids:
         logger.info(f"Downloading audio for {len(new_video_ids)} videos")
 
-        for video_id in new_video_ids:
-            audio_path = download_audio(video_id)
-            update_video_download_status(video_id, audio_path)
-            
-            if audio_path:
-                downloaded += 1
-            else:
-                failed += 1
+        # Downloads are network-bound subprocesses, so threads are enough to
+        # overlap them; DB updates stay on this thread as each one finishes
+        max_workers = max(1, min(settings.download_concurrency, len(new_video_ids)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(download_audio, video_id): video_id
+                for video_id in new_video_ids
+            }
+            for future in as_completed(futures):
+                video_id = futures[future]
+                audio_path = future.result()
+                update_video_download_status(video_id, audio_path)
+
+                if audio_path:
+                    downloaded += 1
+                else:
+                    failed += 1
 
     result = {
         "channel_id": channel_id,
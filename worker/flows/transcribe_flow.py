@@ -1,17 +1,59 @@
+import csv
+import io
 import logging
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
 from typing import Optional
 
+import sqlalchemy as sa
+
 from core.config import settings
 from shared.db.session import get_db_context
-from shared.db.models import Video, Segment
+from shared.db.models import Video
 
 _whisper_model = None
+_whisper_pipeline = None
+
+# csv.writer leaves empty strings unquoted, which COPY would read as NULL;
+# FORCE_NOT_NULL keeps a blank segment's text as '' for the NOT NULL column
+COPY_SEGMENTS_SQL = (
+    "COPY segments (video_id, start_time, end_time, text) "
+    "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (text))"
+)
 
 logger = logging.getLogger(__name__) 
 logger.setLevel(logging.INFO)
 
+def _ensure_converted_model(quantization: str) -> str:
+    """
+    Convert the Whisper checkpoint to a quantized CTranslate2 model once and
+    return its directory. A file lock keeps concurrent workers from racing.
+    """
+    from ctranslate2.converters import TransformersConverter
+    from filelock import FileLock
+
+    model_name = settings.whisper_model_size
+    if "/" not in model_name:
+        model_name = f"openai/whisper-{model_name}"
+
+    output_dir = os.path.join(
+        settings.model_cache_dir,
+        f"{model_name.replace('/', '--')}-ct2-{quantization}",
+    )
+
+    os.makedirs(settings.model_cache_dir, exist_ok=True)
+    with FileLock(f"{output_dir}.lock"):
+        if not os.path.exists(os.path.join(output_dir, "model.bin")):
+            logger.info(f"Converting {model_name} to CTranslate2 ({quantization})...")
+            TransformersConverter(
+                model_name,
+                copy_files=["tokenizer.json", "preprocessor_config.json"],
+            ).convert(output_dir, quantization=quantization, force=True)
+
+    return output_dir
+
 def get_whisper_model():
     """Get or create Whisper model (singleton pattern)."""
     global _whisper_model
@@ -25,17 +67,39 @@ def get_whisper_model():
 
         if not device:
             device = "cuda" if torch.cuda.is_available() else "cpu"
+        model_path = settings.whisper_model_size
+        if settings.whisper_quantization:
+            model_path = _ensure_converted_model(settings.whisper_quantization)
+            compute_type = compute_type or settings.whisper_quantization
+
         if not compute_type:
-            compute_type = "float16" if device == "cuda" else "int8"
+            compute_type = "auto"
 
         _whisper_model = WhisperModel(
-            settings.whisper_model_size,
+            model_path,
             device=device,
             compute_type=compute_type,
+            num_workers=settings.whisper_num_workers,
+            cpu_threads=settings.whisper_cpu_threads,
+        )
+        logger.info(
+            f"Whisper model loaded on {device} "
+            f"(compute_type={_whisper_model.model.compute_type}, requested {compute_type})"
         )
     
     return _whisper_model
 
+def get_whisper_pipeline():
+    """Get or create the batched pipeline that shares the Whisper model's weights."""
+    global _whisper_pipeline
+
+    if _whisper_pipeline is None:
+        from faster_whisper import BatchedInferencePipeline
+
+        _whisper_pipeline = BatchedInferencePipeline(model=get_whisper_model())
+
+    return _whisper_pipeline
+
 def get_pending_videos() -> list[dict]:
     """Get videos that need transcription."""
     with get_db_context() as db:
@@ -59,6 +123,67 @@ def get_pending_videos() -> list[dict]:
         return result
 
 
+def load_audio(audio_path: str):
+    """Decode an audio file to the 16kHz mono float32 array Whisper expects."""
+    from faster_whisper import decode_audio
+
+    if not audio_path or not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    return decode_audio(audio_path)
+
+
+def _transcribe_to_csv(video_id: str, audio, language: str) -> tuple[io.StringIO, int]:
+    """Run Whisper on a path or decoded array and return the segments as CSV rows."""
+    if settings.whisper_batch_size > 1:
+        # VAD-split segments are encoded batch_size at a time
+        segments_generator, info = get_whisper_pipeline().transcribe(
+            audio,
+            language=language,
+            vad_filter=True,
+            batch_size=settings.whisper_batch_size,
+        )
+    else:
+        segments_generator, info = get_whisper_model().transcribe(
+            audio,
+            language=language,
+            vad_filter=True,
+        )
+
+    return _segments_to_csv(video_id, segments_generator)
+
+
+def _segments_to_csv(video_id: str, segments) -> tuple[io.StringIO, int]:
+    """Write segments to an in-memory CSV for COPY_SEGMENTS_SQL as they are yielded."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    segment_count = 0
+    for seg in segments:
+        writer.writerow((video_id, seg.start, seg.end, seg.text.strip()))
+        segment_count += 1
+
+    buffer.seek(0)
+    return buffer, segment_count
+
+
+def save_segments(video_id: str, buffer: io.StringIO, segment_count: int) -> None:
+    """COPY the CSV segments into the database and mark the video transcribed."""
+    with get_db_context() as db:
+        if segment_count:
+            # COPY through the session's own connection, inside its transaction
+            raw_conn = db.connection().connection.driver_connection
+            with raw_conn.cursor() as cur:
+                cur.copy_expert(COPY_SEGMENTS_SQL, buffer)
+
+        db.execute(
+            sa.update(Video)
+            .where(Video.video_id == video_id)
+            .values(transcribed=True)
+        )
+
+        db.commit()
+
+
 def transcribe_video(
     video_id: str,
     audio_path: str,
@@ -72,47 +197,59 @@ def transcribe_video(
         return {"video_id": video_id, "success": False, "segments": 0}
 
     try:
-        model = get_whisper_model()
-        
-        segments_generator, info = model.transcribe(
-            audio_path,
-            language=language,
-            vad_filter=True,
-        )
+        buffer, segment_count = _transcribe_to_csv(video_id, audio_path, language)
+        save_segments(video_id, buffer, segment_count)
 
-        # Collect segments
-        segments = []
-        for seg in segments_generator:
-            segments.append({
-                "start_time": seg.start,
-                "end_time": seg.end,
-                "text": seg.text.strip(),
-            })
-
-        # Save to database
-        with get_db_context() as db:
-            for seg_data in segments:
-                db.add(Segment(
-                    video_id=video_id,
-                    start_time=seg_data["start_time"],
-                    end_time=seg_data["end_time"],
-                    text=seg_data["text"],
-                ))
-
-            video = db.query(Video).filter(Video.video_id == video_id).first()
-            if video:
-                video.transcribed = True
-            
-            db.commit()
-
-        logger.info(f"Transcribed {video_id}: {len(segments)} segments")
-        return {"video_id": video_id, "success": True, "segments": len(segments)}
+        logger.info(f"Transcribed {video_id}: {segment_count} segments")
+        return {"video_id": video_id, "success": True, "segments": segment_count}
 
     except Exception as e:
         logger.error(f"Transcription failed for {video_id}: {e}")
         return {"video_id": video_id, "success": False, "segments": 0, "error": str(e)}
 
 
+def transcribe_pipelined(pending: list[dict], language: str = "es") -> list[dict]:
+    """
+    Transcribe videos one at a time while the next file is decoded and the
+    previous video's segments are written on background threads, so the
+    model never waits on audio decoding or database commits.
+    """
+    results = []
+    writes = []
+
+    with ThreadPoolExecutor(max_workers=1) as decode_pool, ThreadPoolExecutor(max_workers=1) as write_pool:
+        next_audio = decode_pool.submit(load_audio, pending[0]["audio_path"])
+
+        for i, video_data in enumerate(pending):
+            video_id = video_data["video_id"]
+            audio_future = next_audio
+            if i + 1 < len(pending):
+                next_audio = decode_pool.submit(load_audio, pending[i + 1]["audio_path"])
+
+            logger.info(f"Transcribing: {video_id}")
+            try:
+                buffer, segment_count = _transcribe_to_csv(video_id, audio_future.result(), language)
+            except Exception as e:
+                logger.error(f"Transcription failed for {video_id}: {e}")
+                results.append({"video_id": video_id, "success": False, "segments": 0, "error": str(e)})
+                continue
+
+            writes.append((video_id, segment_count, write_pool.submit(save_segments, video_id, buffer, segment_count)))
+
+        for video_id, segment_count, future in writes:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Saving segments failed for {video_id}: {e}")
+                results.append({"video_id": video_id, "success": False, "segments": 0, "error": str(e)})
+                continue
+
+            logger.info(f"Transcribed {video_id}: {segment_count} segments")
+            results.append({"video_id": video_id, "success": True, "segments": segment_count})
+
+    return results
+
+
 def transcribe_flow(
     task_id: str,
     language: str = "es",
@@ -147,14 +284,24 @@ def transcribe_flow(
     failed = 0
     total_segments = 0
 
-    # Process videos sequentially (Whisper is GPU-bound)
-    for video_data in pending:
-        result = transcribe_video(
+    def run(video_data: dict) -> dict:
+        return transcribe_video(
             video_id=video_data["video_id"],
             audio_path=video_data["audio_path"],
             language=language,
         )
 
+    # Each model worker can serve one transcription at a time
+    max_workers = min(settings.whisper_num_workers, len(pending))
+    if max_workers > 1:
+        # Load the singletons up front so threads do not race to create them
+        get_whisper_pipeline() if settings.whisper_batch_size > 1 else get_whisper_model()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run, pending))
+    else:
+        results = transcribe_pipelined(pending, language=language)
+
+    for result in results:
         if result["success"]:
             transcribed += 1
             total_segments += result["segments"]
@@ -13,12 +13,17 @@ from sqlalchemy.orm import Session
 from flows.ingest_flow import ingest_channel_flow
 from flows.transcribe_flow import get_pending_videos, transcribe_flow
 from flows.chunk_flow import chunk_flow
-from flows.embed_flow import embed_flow, embed_question, get_embedding_model
+from flows.embed_flow import embed_flow, embed_questions, get_embedding_model
 
 from shared.db.session import SessionLocal, get_db_context
 from shared.db.models import PipelineTask, TaskStatus
 from shared.db.init.poblate_settings_table import populate_settings
-from shared.db.repositories.settings import SettingsRepository
+from shared.db.init.schema import create_schema
+from shared.db.repositories.settings import (
+    SETTINGS_CHANNEL,
+    SettingsRepository,
+    invalidate_settings_cache,
+)
 from shared.utils.utils import print_settings
 
 from worker.core.config import settings as app_settings, WORKER_SETTINGS_SPEC
@@ -27,6 +32,10 @@ from worker.core.config import settings as app_settings, WORKER_SETTINGS_SPEC
 POLL_INTERVAL = 5
 MAX_RETRIES   = 3
 
+# Question embeddings arriving close together share one forward pass
+EMBED_BATCH_SIZE      = 32
+EMBED_COALESCE_WINDOW = 0.02 # seconds
+
 # LOGGING
 logging.basicConfig(
     level=logging.INFO,
@@ -88,6 +97,25 @@ def fetch_next_task(db: Session) -> PipelineTask | None:
     )
     return db.execute(stmt).scalar_one_or_none()
 
+def fetch_pending_embeddings(db: Session, first: PipelineTask, limit: int) -> list[PipelineTask]:
+    """
+    Claim up to `limit` more pending question embeddings alongside `first`,
+    waiting briefly so near-simultaneous questions are batched.
+    """
+    time.sleep(EMBED_COALESCE_WINDOW)
+
+    stmt = (
+        sql_select(PipelineTask)
+        .where(PipelineTask.status == TaskStatus.PENDING)
+        .where(PipelineTask.task_type == "embed_question")
+        # Rows this transaction already locked are not skipped
+        .where(PipelineTask.id != first.id)
+        .order_by(PipelineTask.created_at.asc())
+        .with_for_update(skip_locked=True)
+        .limit(limit)
+    )
+    return list(db.execute(stmt).scalars())
+
 def process_single_video(task: PipelineTask, video_id: str, db: Session, base_progress: int, segment_size: float, settings: dict) -> bool:
     """
     Runs the full RAG pipeline for a SINGLE video.
@@ -216,31 +244,42 @@ def run_task(task: PipelineTask, db: Session, settings: dict):
         db.commit()
 
 
-def run_embedding(task: PipelineTask, db: Session):
-    logger.info(f"Starting Task ID: {task.id}")
-    
-    task.status = TaskStatus.RUNNING
-    task.started_at = datetime.now(timezone.utc)
-    update_task_state(db, task, 10, "Calculating embedding...")
+def run_embeddings(tasks: list[PipelineTask], db: Session):
+    logger.info(f"Starting Task IDs: {[str(task.id) for task in tasks]}")
+
+    now = datetime.now(timezone.utc)
+    for task in tasks:
+        task.status = TaskStatus.RUNNING
+        task.started_at = now
+        task.progress = 10
+        task.result = "Calculating embedding..."
+    db.commit()
     settings = SettingsRepository.get_settings_db(db, component="WORKER", section="embedding")
 
     try:
-        task.result = embed_question(
-            task.request["question_to_embed"],
+        embeddings = embed_questions(
+            [task.request["question_to_embed"] for task in tasks],
             settings["embedding_model"],
         )
-        task.status = TaskStatus.COMPLETED
-        update_task_state(db, task, 100, None)
+        now = datetime.now(timezone.utc)
+        for task, embedding in zip(tasks, embeddings):
+            task.result = embedding
+            task.status = TaskStatus.COMPLETED
+            task.progress = 100
+            # The task_events trigger only fires once completed_at is set
+            task.completed_at = now
 
     except Exception as e:
         logger.error(f"Critical Task Failure: {e}")
         logger.error(traceback.format_exc())
-        task.status = TaskStatus.FAILED
-        task.error_message = str(e)
-        task.completed_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        for task in tasks:
+            task.status = TaskStatus.FAILED
+            task.error_message = str(e)
+            task.completed_at = now
 
     finally:
-        logger.info(f"Task ID: {task.id} finished: {task.status}")
+        logger.info(f"Embedded {len(tasks)} question(s): {tasks[0].status}")
         db.commit()
 
 def wait_for_notification(db_session: Session, timeout=60):
@@ -253,6 +292,7 @@ def wait_for_notification(db_session: Session, timeout=60):
     
     # Enable LISTEN
     db_session.execute(text("LISTEN task_queue"))
+    db_session.execute(text(f"LISTEN {SETTINGS_CHANNEL}"))
     db_session.commit()
     
     # We dig into the private attributes to find the raw driver connection
@@ -281,12 +321,23 @@ def wait_for_notification(db_session: Session, timeout=60):
             raw_conn.poll()
             # Clean up the queue so memory doesn't grow
             while raw_conn.notifies:
-                raw_conn.notifies.pop(0)
+                notify = raw_conn.notifies.pop(0)
+                if notify.channel == SETTINGS_CHANNEL:
+                    invalidate_settings_cache()
                 
     except Exception as e:
         logger.warning(f"Select failed ({e}), falling back to sleep.")
         time.sleep(POLL_INTERVAL)
 
+def load_settings(db: Session) -> dict:
+    """
+    Merged worker + backend settings. Served from the process cache, which
+    the settings NOTIFY clears, so reading this per task is cheap.
+    """
+    worker_settings = SettingsRepository.get_settings_db(db, component="WORKER")
+    backend_settings = SettingsRepository.get_settings_db(db, component="BACKEND")
+    return worker_settings | backend_settings
+
 def populate_settings_table():
     with get_db_context() as db:
         populate_settings(
@@ -301,14 +352,14 @@ if __name__ == "__main__":
 
     print_settings(logger, app_settings, "Worker settings:", {"openai_api_key", "database_url"})
 
+    # 0. Create extension and tables (if missing)
+    create_schema()
+
     # 1. Bootstrap settings, if empty
     populate_settings_table()
 
     with SessionLocal() as db:
-        worker_settings = SettingsRepository.get_settings_db(db, component="WORKER")
-        backend_settings = SettingsRepository.get_settings_db(db, component="BACKEND")
-
-    settings = worker_settings | backend_settings
+        settings = load_settings(db)
     
     logger.info(f"Settings: {settings}")
 
@@ -338,9 +389,11 @@ if __name__ == "__main__":
                 if task:
                     # 2. If task found, run it
                     if task.task_type == "pipeline":
-                        run_task(task, db, settings)
+                        # Pick up edits made since startup
+                        run_task(task, db, load_settings(db))
                     elif task.task_type == "embed_question":
-                        run_embedding(task, db)
+                        tasks = [task] + fetch_pending_embeddings(db, task, EMBED_BATCH_SIZE - 1)
+                        run_embeddings(tasks, db)
                     else:
                         logger.error(f"Unsupported task type: {task.task_type}")
                         task.status = TaskStatus.FAILED
@@ -0,0 +1,37 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("needs a Postgres DATABASE_URL", allow_module_level=True)
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import text  # noqa: E402
+
+from shared.db.session import engine  # noqa: E402
+from flows.transcribe_flow import COPY_SEGMENTS_SQL, _segments_to_csv  # noqa: E402
+
+
+def test_copy_loads_segment_with_empty_text():
+    segments = [
+        SimpleNamespace(start=0.0, end=1.5, text="  "),
+        SimpleNamespace(start=1.5, end=3.0, text=" hola "),
+    ]
+    buffer, segment_count = _segments_to_csv("vid", segments)
+
+    with engine.connect() as con:
+        # Shadows the real table for this session, with the same NOT NULL text
+        con.execute(text(
+            "CREATE TEMP TABLE segments ("
+            "video_id text, start_time float, end_time float, text text NOT NULL)"
+        ))
+        with con.connection.driver_connection.cursor() as cur:
+            cur.copy_expert(COPY_SEGMENTS_SQL, buffer)
+
+        rows = con.execute(text("SELECT text FROM segments ORDER BY start_time")).scalars().all()
+        con.rollback()
+
+    assert segment_count == 2
+    assert rows == ["", "hola"]